@@ -0,0 +1,258 @@
+"""Teste de carga da API em processo.
+
+Popula um banco SQLite (aiosqlite) temporário com `--users` usuários e
+`--todos` todos por usuário usando as factories dos testes, e dispara
+requisições contra `fast_zero.app.app` pelo `httpx.ASGITransport`, com
+`--concurrency` requisições simultâneas por endpoint. Para cada endpoint
+reporta p50/p95/p99, requisições por segundo e erros, em JSON, para que
+duas execuções possam ser comparadas.
+
+Uso:
+    python -m benchmarks.load --users 100 --todos 100 --concurrency 10 \\
+        --requests 500 --output load.json
+
+Com `--baseline load.json`, o relatório inclui a variação percentual de
+cada métrica em relação a uma execução anterior.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable
+
+import factory
+import factory.random
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fast_zero.app import app
+from fast_zero.database import engine_options, get_session, set_sqlite_pragmas
+from fast_zero.hashing import password_hasher
+from fast_zero.models import Todo, table_registry
+from fast_zero.security import get_password_hash
+from fast_zero.settings import Settings
+from tests.factories import TodoFactory, UserFactory
+
+PASSWORD = 'bench-password'
+
+
+@dataclass
+class BenchUser:
+    """Usuário semeado, com o token já obtido."""
+
+    id: int
+    username: str
+    email: str
+    headers: dict[str, str]
+
+
+Request = Callable[[AsyncClient, BenchUser], Awaitable[Response]]
+
+
+async def seed(engine, users: int, todos: int) -> list[tuple[int, str, str]]:
+    # um único hash: o custo do argon2 por usuário só atrasaria a carga
+    password = get_password_hash(PASSWORD)
+    seeded = []
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for _ in range(users):
+            user = UserFactory(password=password)
+            session.add(user)
+            await session.flush()
+            if todos:
+                await session.execute(
+                    insert(Todo),
+                    factory.build_batch(
+                        dict, todos, FACTORY_CLASS=TodoFactory, user_id=user.id
+                    ),
+                )
+            seeded.append((user.id, user.username, user.email))
+        await session.commit()
+    return seeded
+
+
+async def login(client: AsyncClient, email: str) -> Response:
+    return await client.post(
+        '/auth/token', data={'username': email, 'password': PASSWORD}
+    )
+
+
+def scenarios() -> dict[str, Request]:
+    def todo_payload() -> dict[str, str]:
+        return {
+            'title': f'load {random.randint(0, 10**6)}',
+            'description': 'load test',
+            'state': 'todo',
+        }
+
+    return {
+        'login': lambda client, user: login(client, user.email),
+        'list_todos': lambda client, user: client.get(
+            '/todos/?limit=100', headers=user.headers
+        ),
+        'list_todos_by_state': lambda client, user: client.get(
+            '/todos/?state=doing&limit=20', headers=user.headers
+        ),
+        'search_todos': lambda client, user: client.get(
+            '/todos/?title=the', headers=user.headers
+        ),
+        'list_users': lambda client, user: client.get('/users/?limit=20'),
+        'get_user': lambda client, user: client.get(f'/users/{user.id}'),
+        'create_todo': lambda client, user: client.post(
+            '/todos/', headers=user.headers, json=todo_payload()
+        ),
+        'todo_changes': lambda client, user: client.get(
+            '/todos/changes?limit=100', headers=user.headers
+        ),
+    }
+
+
+async def run_scenario(
+    client: AsyncClient,
+    users: list[BenchUser],
+    request: Request,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            user = random.choice(users)
+            start = perf_counter()
+            response = await request(client, user)
+            latencies.append(perf_counter() - start)
+            if response.status_code >= HTTPStatus.BAD_REQUEST:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+        'max_ms': max(latencies) * 1000,
+    }
+
+
+def compare(endpoints: dict, baseline: dict) -> dict:
+    delta = {}
+    for name, metrics in endpoints.items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        delta[name] = {
+            f'{metric}_pct': (metrics[metric] - before[metric])
+            / before[metric]
+            * 100
+            for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+            if before.get(metric)
+        }
+    return delta
+
+
+async def run(args: argparse.Namespace, database: Path) -> dict:
+    settings = Settings(DATABASE_URL=f'sqlite+aiosqlite:///{database}')
+    engine = create_async_engine(
+        settings.DATABASE_URL, **engine_options(settings)
+    )
+    set_sqlite_pragmas(engine, settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+    seeded = await seed(engine, args.users, args.todos)
+
+    async def bench_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = bench_session
+    transport = ASGITransport(app=app)
+    results = {}
+    try:
+        async with AsyncClient(
+            transport=transport, base_url='http://bench'
+        ) as client:
+            users = []
+            for user_id, username, email in seeded:
+                token = (await login(client, email)).json()['access_token']
+                headers = {'Authorization': f'Bearer {token}'}
+                users.append(BenchUser(user_id, username, email, headers))
+
+            selected = scenarios()
+            if args.endpoints:
+                selected = {name: selected[name] for name in args.endpoints}
+            for name, request in selected.items():
+                await run_scenario(
+                    client, users, request, args.warmup, args.concurrency
+                )
+                results[name] = await run_scenario(
+                    client, users, request, args.requests, args.concurrency
+                )
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        await engine.dispose()
+        password_hasher.shutdown()
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--todos', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--endpoints', nargs='*', choices=sorted(scenarios()), default=None
+    )
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    factory.random.reseed_random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoints = asyncio.run(run(args, Path(tmp) / 'load.db'))
+
+    report = {
+        'config': {
+            'users': args.users,
+            'todos_per_user': args.todos,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'seed': args.seed,
+        },
+        'endpoints': endpoints,
+    }
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        report['delta'] = compare(endpoints, baseline)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
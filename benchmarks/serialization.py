@@ -0,0 +1,136 @@
+"""Compara o custo de montar e serializar uma página de `GET /todos/`.
+
+- `entities`: carrega entidades `Todo` e deixa o `response_model` do
+  FastAPI validar cada item contra `TodoPublic`
+- `response_model`: o caminho padrão; seleciona só as colunas da resposta
+  e valida as linhas pelo `response_model`
+- `fast`: o modo `FAST_SERIALIZATION`; as mesmas colunas, serializadas com
+  `model_construct`, sem revalidar
+
+Uso:
+    python -m benchmarks.serialization --page-size 100
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+from time import perf_counter
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from fast_zero.models import Todo, TodoState, User, table_registry
+from fast_zero.routers.todos import LIST_COLUMNS
+from fast_zero.schemas import TodoList, TodoPublic
+from fast_zero.serialization import construct, json_response
+
+RESPONSE_FIELD = create_model_field(
+    name='Response', type_=TodoList, mode='serialization'
+)
+
+
+def seed(session: Session, rows: int) -> int:
+    user = User(username='bench', password='x', email='bench@email.com')
+    session.add(user)
+    session.flush()
+    session.add_all(
+        Todo(
+            title=f'todo {n}',
+            description='description ' * 5,
+            state=TodoState.todo,
+            user_id=user.id,
+        )
+        for n in range(rows)
+    )
+    session.commit()
+    return user.id
+
+
+async def render(todos: list) -> bytes:
+    content = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content={'todos': todos},
+        exclude_none=True,
+    )
+    return JSONResponse(content).body
+
+
+async def entities(session: Session, user_id: int, limit: int) -> bytes:
+    todos = session.scalars(
+        select(Todo).where(Todo.user_id == user_id).limit(limit)
+    ).all()
+    return await render(todos)
+
+
+async def response_model(session: Session, user_id: int, limit: int) -> bytes:
+    rows = session.execute(
+        select(*LIST_COLUMNS).where(Todo.user_id == user_id).limit(limit)
+    ).all()
+    return await render(rows)
+
+
+async def fast(session: Session, user_id: int, limit: int) -> bytes:
+    rows = session.execute(
+        select(*LIST_COLUMNS).where(Todo.user_id == user_id).limit(limit)
+    ).all()
+    content = TodoList.model_construct(todos=construct(TodoPublic, rows))
+    return json_response(content, exclude_none=True).body
+
+
+PATHS = {
+    'entities': entities,
+    'response_model': response_model,
+    'fast': fast,
+}
+
+
+async def measure(engine, user_id: int, limit: int, iterations: int) -> dict:
+    timings: dict[str, list[float]] = {}
+    for name, path in PATHS.items():
+        for _ in range(iterations):
+            # sessão nova a cada vez, como em uma requisição
+            with Session(engine) as session:
+                start = perf_counter()
+                await path(session, user_id, limit)
+                timings.setdefault(name, []).append(perf_counter() - start)
+
+    return {
+        name: {
+            'p50_ms': statistics.median(values) * 1000,
+            'p95_ms': sorted(values)[int(len(values) * 0.95)] * 1000,
+        }
+        for name, values in timings.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    table_registry.metadata.create_all(engine)
+    with Session(engine) as session:
+        user_id = seed(session, args.page_size)
+
+    with Session(engine) as session:
+        bodies = [
+            json.loads(asyncio.run(path(session, user_id, args.page_size)))
+            for path in PATHS.values()
+        ]
+    assert all(body == bodies[0] for body in bodies)
+
+    result = asyncio.run(
+        measure(engine, user_id, args.page_size, args.iterations)
+    )
+    engine.dispose()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
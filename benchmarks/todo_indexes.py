@@ -0,0 +1,125 @@
+"""Mede a latência das consultas de todos com e sem os índices compostos
+`(user_id, id)` e `(user_id, state, id)`.
+
+Uso:
+    python -m benchmarks.todo_indexes --rows 1000000 --users 1000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from fast_zero.models import Todo, TodoState, table_registry
+
+TODO_INDEXES = [
+    index for index in Todo.__table__.indexes if 'user_id' in index.columns
+]
+
+
+def seed(engine, rows: int, users: int) -> None:
+    states = [state.name for state in TodoState]
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL '
+            'SELECT n + 1 FROM seq WHERE n < ?) '
+            'INSERT INTO users (username, password, email) '
+            "SELECT 'user' || n, 'x', 'user' || n || '@email.com' FROM seq",
+            (users,),
+        )
+        batch = 50_000
+        for start in range(0, rows, batch):
+            conn.exec_driver_sql(
+                'INSERT INTO todos (title, description, state, user_id) '
+                'VALUES (?, ?, ?, ?)',
+                [
+                    (
+                        f'todo {n}',
+                        'description',
+                        random.choice(states),
+                        random.randint(1, users),
+                    )
+                    for n in range(start, min(start + batch, rows))
+                ],
+            )
+        conn.exec_driver_sql('ANALYZE')
+
+
+def queries(users: int, limit: int):
+    user_id = random.randint(1, users)
+    state = random.choice(list(TodoState))
+    return {
+        'list_todos': select(Todo)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.id)
+        .limit(limit + 1),
+        'list_todos_by_state': select(Todo)
+        .where(Todo.user_id == user_id, Todo.state == state)
+        .order_by(Todo.id)
+        .limit(limit + 1),
+        'update_todo_lookup': select(Todo).where(
+            Todo.id == random.randint(1, 1000), Todo.user_id == user_id
+        ),
+    }
+
+
+def measure(engine, users: int, iterations: int, limit: int) -> dict:
+    timings: dict[str, list[float]] = {}
+    with engine.connect() as conn:
+        for _ in range(iterations):
+            for name, query in queries(users, limit).items():
+                start = perf_counter()
+                conn.execute(query).all()
+                timings.setdefault(name, []).append(perf_counter() - start)
+
+        # deleta os todos de um usuário, como no delete_user, e desfaz
+        conn.rollback()
+        start = perf_counter()
+        conn.execute(delete(Todo).where(Todo.user_id == 1))
+        timings['delete_user_todos'] = [perf_counter() - start]
+        conn.rollback()
+
+    return {
+        name: {
+            'p50_ms': statistics.median(values) * 1000,
+            'p95_ms': sorted(values)[int(len(values) * 0.95)] * 1000,
+        }
+        for name, values in timings.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f'sqlite:///{Path(tmp) / "bench.db"}')
+        table_registry.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for index in TODO_INDEXES:
+                conn.execute(DropIndex(index))
+        seed(engine, args.rows, args.users)
+
+        before = measure(engine, args.users, args.iterations, args.limit)
+        with engine.begin() as conn:
+            for index in TODO_INDEXES:
+                conn.execute(CreateIndex(index))
+            conn.exec_driver_sql('ANALYZE')
+        after = measure(engine, args.users, args.iterations, args.limit)
+        engine.dispose()
+
+    print(json.dumps({'before': before, 'after': after}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
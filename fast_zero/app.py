@@ -1,10 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from .routers import auth, todos, users
+from .hashing import password_hasher
+from .metrics import HTTPMetricsMiddleware, http_metrics
+from .profiling import ProfilingMiddleware, profiler
+from .query_stats import QueryStatsMiddleware, register_query_routes
+from .routers import auth, metrics, todos, users
 from .schemas import Message
+from .settings import Settings
+
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    password_hasher.shutdown()
+    profiler.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware, debug=settings.DEBUG)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+app.add_middleware(HTTPMetricsMiddleware)
 app.include_router(auth.router)
+app.include_router(metrics.router)
 app.include_router(todos.router)
 app.include_router(users.router)
 
@@ -12,3 +34,7 @@ app.include_router(users.router)
 @app.get('/')
 async def read_root() -> Message:
     return {'message': 'Hello World'}
+
+
+http_metrics.register_routes(app.routes)
+register_query_routes(app.routes)
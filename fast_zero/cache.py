@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from time import time
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração por item.
+
+    Cada entrada expira no menor valor entre `ttl` segundos após a inserção
+    e o `expires_at` informado (timestamp Unix). Quando o cache atinge
+    `maxsize`, a entrada usada há mais tempo é descartada.
+
+    O cache é local ao processo: invalidações não se propagam entre workers,
+    por isso o `ttl` limita por quanto tempo um dado pode ficar obsoleto.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Obtém um valor do cache
+
+        Args:
+            key (Hashable): chave do item
+
+        Returns:
+            Any | None: valor armazenado ou None se ausente/expirado
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, expires_at: float | None = None
+    ) -> None:
+        """Armazena um valor no cache
+
+        Args:
+            key (Hashable): chave do item
+            value (Any): valor a ser armazenado
+            expires_at (float | None): limite absoluto de validade
+        """
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+
+        deadline = time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        self._data[key] = (deadline, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses}
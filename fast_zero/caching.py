@@ -0,0 +1,103 @@
+from hashlib import sha256
+from http import HTTPStatus
+from typing import Any, Iterable, Sequence
+
+from fastapi import Response
+from sqlalchemy.orm import InstrumentedAttribute
+
+from fast_zero.pagination import Page
+
+
+def make_etag(*parts: Any) -> str:
+    """Gera uma ETag forte a partir das partes que identificam a versão
+
+    Args:
+        *parts (Any): valores que mudam quando a representação muda
+
+    Returns:
+        str: ETag entre aspas
+    """
+    digest = sha256('\x1f'.join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def rows_etag(
+    rows: Iterable[Any],
+    columns: Sequence[InstrumentedAttribute],
+    *extra: Any,
+) -> str:
+    """Gera a ETag de uma lista a partir das colunas de versão de cada linha
+
+    Aceita tanto objetos mapeados quanto linhas de uma consulta que projete
+    `columns`, de modo que a verificação barata e a resposta completa
+    produzem a mesma ETag.
+
+    Args:
+        rows (Iterable[Any]): itens da página
+        columns (Sequence[InstrumentedAttribute]): colunas de versão
+        *extra (Any): partes adicionais, como os cursores da página
+
+    Returns:
+        str: ETag entre aspas
+    """
+    parts = [getattr(row, column.key) for row in rows for column in columns]
+    return make_etag(*parts, *extra)
+
+
+def page_etag(
+    page: Page, columns: Sequence[InstrumentedAttribute], *extra: Any
+) -> str:
+    """Gera a ETag de uma página: itens, cursores e `has_more`
+
+    Args:
+        page (Page): página
+        columns (Sequence[InstrumentedAttribute]): colunas de versão
+        *extra (Any): partes adicionais, como os totais da listagem
+
+    Returns:
+        str: ETag entre aspas
+    """
+    return rows_etag(
+        page.items,
+        columns,
+        page.next_cursor,
+        page.prev_cursor,
+        page.has_more,
+        *extra,
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Verifica o cabeçalho `If-None-Match` contra a ETag atual
+
+    Usa a comparação fraca da RFC 9110, como pede o `If-None-Match`.
+
+    Args:
+        if_none_match (str | None): valor do cabeçalho
+        etag (str): ETag atual
+
+    Returns:
+        bool: True se o cliente já tem a versão atual
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return etag in tags
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Resposta 304 sem corpo para uma ETag que o cliente já tem
+
+    Args:
+        etag (str): ETag atual
+        cache_control (str): valor do cabeçalho `Cache-Control`
+
+    Returns:
+        Response: resposta 304
+    """
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={'ETag': etag, 'Cache-Control': cache_control},
+    )
@@ -0,0 +1,61 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import (
+    COUNTER_DDL,
+    Todo,
+    TodoCount,
+    TodoState,
+    User,
+    UserCount,
+)
+
+
+async def todo_counts(
+    session: AsyncSession, user_id: int
+) -> dict[TodoState, int]:
+    """Conta os todos de um usuário por estado
+
+    No SQLite e no PostgreSQL lê os contadores de `todo_counts`, mantidos
+    por triggers, em vez de contar as linhas de `todos`. Outros bancos
+    recaem em um `COUNT(*)` agrupado.
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+        user_id (int): dono dos todos
+
+    Returns:
+        dict[TodoState, int]: quantidade por estado, incluindo os zerados
+    """
+    if session.bind.dialect.name in COUNTER_DDL:
+        query = select(TodoCount.state, TodoCount.count).where(
+            TodoCount.user_id == user_id
+        )
+    else:
+        query = (
+            select(Todo.state, func.count())
+            .where(Todo.user_id == user_id)
+            .group_by(Todo.state)
+        )
+    counts = dict.fromkeys(TodoState, 0)
+    counts.update((await session.execute(query)).tuples().all())
+    return counts
+
+
+async def user_total(session: AsyncSession) -> int:
+    """Conta os usuários cadastrados
+
+    No SQLite e no PostgreSQL lê o contador de `user_count`, mantido por
+    triggers. Outros bancos recaem em um `COUNT(*)`.
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+
+    Returns:
+        int: quantidade de usuários
+    """
+    if session.bind.dialect.name in COUNTER_DDL:
+        query = select(UserCount.count).where(UserCount.id == 1)
+    else:
+        query = select(func.count()).select_from(User)
+    return await session.scalar(query) or 0
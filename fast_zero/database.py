@@ -1,8 +1,144 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from time import perf_counter
 
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from fast_zero.metrics import LatencyStats
+from fast_zero.profiling import profiler
+from fast_zero.query_stats import instrument_engine
 from fast_zero.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+class PoolMetrics:
+    """Métricas de checkout do pool de conexões."""
+
+    def __init__(self):
+        self.checkout_wait = LatencyStats()
+        self.timeouts = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Pool de conexões que registra o tempo de espera por uma conexão."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_wait.observe(perf_counter() - start)
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in {
+        None,
+        '',
+        ':memory:',
+    }
+
+
+def engine_options(settings: Settings) -> dict:
+    """Monta os argumentos de `create_async_engine` para o banco configurado
+
+    Args:
+        settings (Settings): configurações da aplicação
+
+    Returns:
+        dict: argumentos nomeados para `create_async_engine`
+    """
+    url = make_url(settings.DATABASE_URL)
+    options = {
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+        'query_cache_size': settings.DB_QUERY_CACHE_SIZE,
+    }
+    if not _is_memory_sqlite(url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        options['connect_args'] = {
+            'cached_statements': settings.DB_STATEMENT_CACHE_SIZE
+        }
+    elif url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE
+        }
+    return options
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, settings: Settings) -> None:
+    """Aplica os pragmas do SQLite a cada nova conexão
+
+    Args:
+        engine (AsyncEngine): engine do SQLite
+        settings (Settings): configurações da aplicação
+    """
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        pragmas = {
+            'journal_mode': settings.SQLITE_JOURNAL_MODE,
+            'synchronous': settings.SQLITE_SYNCHRONOUS,
+            'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        }
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Resume o estado do pool de conexões da engine
+
+    Args:
+        engine (AsyncEngine): engine monitorada
+
+    Returns:
+        dict: conexões em uso, capacidade, saturação e tempo de checkout
+    """
+    pool = engine.pool
+    stats = {
+        'checkout_wait': pool_metrics.checkout_wait.snapshot(),
+        'timeouts': pool_metrics.timeouts,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        capacity = pool.size() + max(pool.max_overflow, 0)
+        stats.update(
+            checked_out=pool.checkedout(),
+            capacity=capacity,
+            saturation=pool.checkedout() / capacity if capacity else 0.0,
+        )
+    return stats
+
+
+settings = Settings()
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings))
+if engine.dialect.name == 'sqlite':
+    set_sqlite_pragmas(engine, settings)
+instrument_engine(engine)
+if settings.PROFILING_ENABLED:
+    profiler.instrument(engine)
 
 
 async def get_session():  # pragma: no cover
@@ -0,0 +1,180 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from fast_zero.settings import Settings
+
+RESYNC = 'resync'
+
+
+class Subscription:
+    """Fila limitada de eventos de um assinante.
+
+    Publicar nunca bloqueia: se o assinante não consome rápido o bastante e
+    a fila enche, os eventos seguintes são descartados e o próximo evento
+    entregue é um `resync`, avisando o cliente para buscar o que perdeu em
+    `GET /todos/changes`.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize)
+        self.lagged = False
+        self.dropped = 0
+
+    def put(self, event: str, data: str) -> None:
+        """Enfileira um evento sem bloquear
+
+        Args:
+            event (str): tipo do evento
+            data (str): carga já serializada em JSON
+        """
+        if not self.lagged:
+            try:
+                self.queue.put_nowait((event, data))
+                return
+            except asyncio.QueueFull:
+                self.lagged = True
+        self.dropped += 1
+
+    async def get(self) -> tuple[str, str]:
+        """Aguarda o próximo evento
+
+        Returns:
+            tuple[str, str]: tipo do evento e carga
+        """
+        if self.lagged:
+            # os eventos na fila estão incompletos: o cliente ressincroniza
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.lagged = False
+            return RESYNC, '{}'
+        return await self.queue.get()
+
+
+class Broker(ABC):
+    """Interface de pub/sub de eventos por canal.
+
+    Um canal é o id do usuário dono dos todos. A implementação em memória só
+    entrega eventos a assinantes do mesmo processo; com vários workers, uma
+    implementação sobre um serviço externo deve substituí-la em
+    `get_broker`.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: Hashable, event: str, data: str) -> None:
+        """Publica um evento para os assinantes do canal
+
+        Args:
+            channel (Hashable): canal do evento
+            event (str): tipo do evento
+            data (str): carga já serializada em JSON
+        """
+
+    @abstractmethod
+    def subscribe(
+        self, channel: Hashable
+    ) -> AbstractAsyncContextManager[Subscription]:
+        """Assina um canal enquanto o contexto estiver aberto
+
+        Args:
+            channel (Hashable): canal assinado
+
+        Returns:
+            AbstractAsyncContextManager[Subscription]: assinatura
+        """
+
+    @abstractmethod
+    def has_subscribers(self, channel: Hashable) -> bool:
+        """Indica se vale a pena montar eventos para o canal
+
+        Args:
+            channel (Hashable): canal do evento
+
+        Returns:
+            bool: True se há assinantes
+        """
+
+
+class InMemoryBroker(Broker):
+    """Broker local ao processo, com uma fila limitada por assinante."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._channels: dict[Hashable, set[Subscription]] = {}
+
+    async def publish(self, channel: Hashable, event: str, data: str) -> None:
+        for subscription in self._channels.get(channel, ()):
+            subscription.put(event, data)
+
+    @asynccontextmanager
+    async def subscribe(
+        self, channel: Hashable
+    ) -> AsyncIterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._channels[channel]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+
+    def has_subscribers(self, channel: Hashable) -> bool:
+        return channel in self._channels
+
+    def stats(self) -> dict[str, int]:
+        """Retorna o número de canais e assinantes e os eventos descartados
+
+        Returns:
+            dict[str, int]: estatísticas do broker
+        """
+        subscriptions = [
+            subscription
+            for subscribers in self._channels.values()
+            for subscription in subscribers
+        ]
+        return {
+            'channels': len(self._channels),
+            'subscribers': len(subscriptions),
+            'dropped': sum(sub.dropped for sub in subscriptions),
+        }
+
+
+async def sse_stream(
+    broker: Broker, channel: Hashable, heartbeat: float
+) -> AsyncIterator[str]:
+    """Transmite os eventos de um canal no formato Server-Sent Events
+
+    Envia um comentário a cada `heartbeat` segundos sem eventos, para que
+    proxies não encerrem a conexão ociosa. A assinatura é desfeita quando o
+    cliente desconecta e o gerador é cancelado.
+
+    Args:
+        broker (Broker): broker de eventos
+        channel (Hashable): canal assinado
+        heartbeat (float): intervalo máximo sem enviar nada, em segundos
+
+    Yields:
+        str: mensagem SSE
+    """
+    async with broker.subscribe(channel) as subscription:
+        yield ': connected\n\n'
+        while True:
+            try:
+                event, data = await asyncio.wait_for(
+                    subscription.get(), heartbeat
+                )
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f'event: {event}\ndata: {data}\n\n'
+
+
+settings = Settings()
+broker = InMemoryBroker(settings.EVENTS_QUEUE_SIZE)
+
+
+def get_broker() -> Broker:
+    return broker
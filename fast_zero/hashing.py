@@ -0,0 +1,113 @@
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from http import HTTPStatus
+from time import perf_counter
+
+from fastapi import HTTPException
+
+from fast_zero.metrics import LatencyStats
+from fast_zero.security import get_password_hash, verify_password
+from fast_zero.settings import Settings
+
+
+class PasswordHasher:
+    """Executa o hash e a verificação de senhas em um pool de workers,
+    liberando o event loop durante o custo do Argon2.
+
+    O número de chamadas pendentes (em execução ou na fila) é limitado por
+    `max_pending`; quando o limite é atingido a chamada é rejeitada com
+    503 em vez de enfileirar indefinidamente.
+    """
+
+    def __init__(
+        self, workers: int, max_pending: int, executor: str = 'thread'
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_type = executor
+        self.pending = 0
+        self.rejected = 0
+        self.hash_latency = LatencyStats()
+        self.verify_latency = LatencyStats()
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if self.executor_type == 'process'
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, latency: LatencyStats, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server busy, try again later',
+                headers={'Retry-After': '1'},
+            )
+        self.pending += 1
+        start = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            latency.observe(perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        """Converte uma senha em hash sem bloquear o event loop
+
+        Args:
+            password (str): senha do usuário
+
+        Returns:
+            str: hash da senha
+        """
+        return await self._run(self.hash_latency, get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifica uma senha sem bloquear o event loop
+
+        Args:
+            plain_password (str): senha limpa
+            hashed_password (str): senha criptografada
+
+        Returns:
+            bool: se a senha está correta
+        """
+        return await self._run(
+            self.verify_latency,
+            verify_password,
+            plain_password,
+            hashed_password,
+        )
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'hash': self.hash_latency.snapshot(),
+            'verify': self.verify_latency.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+settings = Settings()
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
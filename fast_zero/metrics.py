@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate
+from time import perf_counter
+from typing import Iterable, Sequence
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class LatencyStats:
+    """Acumula estatísticas simples de latência (em segundos)."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Registra a duração de uma chamada.
+
+        Args:
+            seconds (float): duração da chamada em segundos
+        """
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'max': self.max,
+        }
+
+
+# limites (em segundos) dos buckets do histograma de latência HTTP
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STATUS_CLASSES = ('1xx', '2xx', '3xx', '4xx', '5xx')
+UNMATCHED_ROUTE = 'unmatched'
+# método das requisições fora das rotas registradas: o método vem do
+# cliente e não pode virar label
+OTHER_METHOD = 'other'
+
+
+class Histogram:
+    """Histograma de buckets fixos.
+
+    `observe` incrementa só o bucket da observação; as contagens
+    cumulativas do formato do Prometheus são calculadas na exposição.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra uma observação.
+
+        Args:
+            value (float): valor observado
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Retorna os buckets cumulativos, incluindo `+Inf`.
+
+        Returns:
+            list[tuple[str, int]]: pares (limite, observações até ele)
+        """
+        bounds = [*map(str, self.buckets), '+Inf']
+        return list(zip(bounds, accumulate(self.counts)))
+
+
+class RouteMetrics:
+    """Latência e respostas por classe de status de uma rota."""
+
+    __slots__ = ('latency', 'responses')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.responses = dict.fromkeys(STATUS_CLASSES, 0)
+
+
+class HTTPMetrics:
+    """Métricas das requisições HTTP, por método e rota.
+
+    Os conjuntos de labels são registrados a partir das rotas da aplicação
+    antes da primeira requisição, de modo que o caminho quente só consulta
+    um dicionário e incrementa contadores já existentes. Requisições fora
+    das rotas registradas (caminho desconhecido ou método não aceito pela
+    rota) vão todas para a série `unmatched`, então o número de séries não
+    depende do que os clientes enviam.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.unmatched = RouteMetrics()
+        self.routes: dict[tuple[str, str], RouteMetrics] = {
+            (OTHER_METHOD, UNMATCHED_ROUTE): self.unmatched
+        }
+
+    def register_routes(self, routes: Iterable[BaseRoute]) -> None:
+        """Registra as métricas de cada método e caminho das rotas.
+
+        Args:
+            routes (Iterable[BaseRoute]): rotas da aplicação
+        """
+        for route in routes:
+            for method in getattr(route, 'methods', None) or ():
+                self.routes.setdefault((method, route.path), RouteMetrics())
+
+    def route(self, method: str, path: str | None) -> RouteMetrics:
+        """Obtém as métricas de uma rota registrada.
+
+        Args:
+            method (str): método HTTP
+            path (str | None): caminho da rota, com os parâmetros sem
+                substituir
+
+        Returns:
+            RouteMetrics: métricas da rota, ou as de `unmatched`
+        """
+        return self.routes.get((method, path), self.unmatched)
+
+
+http_metrics = HTTPMetrics()
+
+
+class HTTPMetricsMiddleware:
+    """Middleware ASGI que mede a latência e as respostas de cada rota.
+
+    A latência vai até o fim do envio da resposta. Requisições que não
+    correspondem a nenhuma rota registrada são agregadas sob `unmatched`.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: HTTPMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.metrics.in_flight += 1
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            self.metrics.in_flight -= 1
+            route = scope.get('route')
+            path = route.path if route is not None else None
+            metrics = self.metrics.route(scope['method'], path)
+            metrics.latency.observe(elapsed)
+            metrics.responses[STATUS_CLASSES[min(status // 100, 5) - 1]] += 1
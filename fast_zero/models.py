@@ -1,11 +1,41 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, event, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
+from sqlalchemy.sql.expression import FunctionElement
 
 table_registry = registry()
 
+# formato em que o SQLAlchemy grava datas no SQLite; `%f` do SQLite só tem
+# milissegundos, então os microssegundos são completados com zeros
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+class utcnow(FunctionElement):
+    """Momento atual, para defaults de colunas de data.
+
+    No SQLite o `CURRENT_TIMESTAMP` grava `'AAAA-MM-DD HH:MM:SS'`, enquanto
+    datas vindas do Python (como os valores de um cursor) são gravadas com
+    `.ffffff`. Como o SQLite compara datas como texto, a mistura faz a
+    paginação por keyset pular linhas do mesmo segundo; aqui o default usa
+    o mesmo formato das datas do Python. Nos demais bancos é o `now()`.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return compiler.process(func.now(), **kw)
+
+
+@compiles(utcnow, 'sqlite')
+def _compile_utcnow_sqlite(element, compiler, **kw):
+    return SQLITE_NOW
+
 
 class TodoState(str, Enum):
     draft = 'draft'
@@ -18,6 +48,10 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_create_at_id', 'create_at', 'id'),
+        Index('ix_users_updated_at_id', 'updated_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -26,22 +60,254 @@ class User:
     todos: Mapped[list['Todo']] = relationship(
         init=False,
         cascade='all, delete-orphan',
-        lazy='selectin',
+        lazy='raise',
     )
     create_at: Mapped[datetime] = mapped_column(
-        init=False, server_default=func.now()
+        init=False, server_default=utcnow()
     )
     updated_at: Mapped[datetime] = mapped_column(
-        init=False, server_default=func.now(), onupdate=func.now()
+        init=False, server_default=utcnow(), onupdate=utcnow()
     )
+    version: Mapped[int] = mapped_column(init=False, server_default='1')
+
+    __mapper_args__ = {'eager_defaults': True, 'version_id_col': version}
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __table_args__ = (
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index('ix_todos_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_todos_user_id_title_id', 'user_id', 'title', 'id'),
+        Index('ix_todos_user_id_create_at_id', 'user_id', 'create_at', 'id'),
+        Index('ix_todos_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+        Index('ix_todos_user_id_change_seq_id', 'user_id', 'change_seq', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     state: Mapped[TodoState]
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    # posição da última escrita no feed de mudanças do dono, gravada por
+    # triggers (ver `ChangeSequence`)
+    change_seq: Mapped[int] = mapped_column(init=False, server_default='0')
+    create_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=utcnow()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=utcnow(), onupdate=utcnow()
+    )
+    version: Mapped[int] = mapped_column(init=False, server_default='1')
+
+    __mapper_args__ = {'eager_defaults': True, 'version_id_col': version}
+
+
+@table_registry.mapped_as_dataclass
+class ChangeSequence:
+    """Última posição do feed de mudanças dos todos de um usuário.
+
+    Mantida por triggers em `todos` (ver `CHANGE_SEQ_DDL`): cada linha
+    inserida, ou atualizada com nova `version`, recebe a próxima posição em
+    `Todo.change_seq`. A linha do contador fica bloqueada até o commit,
+    então as escritas de um usuário são confirmadas na ordem da sequência.
+    """
+
+    __tablename__ = 'change_sequences'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    value: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoCount:
+    """Quantidade de todos de um usuário em um estado.
+
+    Mantida por triggers em `todos` (ver `COUNTER_DDL`), para que os totais
+    da listagem não precisem de `COUNT(*)`.
+    """
+
+    __tablename__ = 'todo_counts'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class UserCount:
+    """Quantidade de usuários cadastrados.
+
+    Linha única (`id = 1`) mantida por triggers em `users` (ver
+    `COUNTER_DDL`), para que o total da listagem não precise de `COUNT(*)`.
+    """
+
+    __tablename__ = 'user_count'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+# Busca textual: no SQLite uma tabela FTS5 (tokenizer trigram, que preserva
+# a busca por substring) mantida por triggers; no PostgreSQL índices GIN
+# sobre `to_tsvector`. Ver `fast_zero.search`.
+SQLITE_SEARCH_DDL = [
+    'CREATE VIRTUAL TABLE todos_fts USING fts5(title, description, '
+    "content='todos', content_rowid='id', tokenize='trigram')",
+    'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN '
+    'INSERT INTO todos_fts(rowid, title, description) '
+    'VALUES (new.id, new.title, new.description); END',
+    'CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN '
+    'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    'CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description '
+    'ON todos BEGIN '
+    'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+    "VALUES ('delete', old.id, old.title, old.description); "
+    'INSERT INTO todos_fts(rowid, title, description) '
+    'VALUES (new.id, new.title, new.description); END',
+]
+POSTGRESQL_SEARCH_DDL = [
+    'CREATE INDEX ix_todos_title_search ON todos '
+    "USING gin (to_tsvector('simple', title))",
+    'CREATE INDEX ix_todos_description_search ON todos '
+    "USING gin (to_tsvector('simple', description))",
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Todo.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
+event.listen(
+    Todo.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS todos_fts').execute_if(dialect='sqlite'),
+)
+for statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(
+        Todo.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='postgresql'),
+    )
+
+
+# Contadores por usuário e estado: triggers em `todos` mantêm `todo_counts`
+# na mesma transação da escrita, cobrindo também as escritas em massa. O
+# total de usuários em `user_count` segue o mesmo esquema.
+SQLITE_COUNTER_DDL = [
+    'CREATE TRIGGER todo_counts_insert AFTER INSERT ON todos BEGIN '
+    'INSERT INTO todo_counts (user_id, state, count) '
+    'VALUES (new.user_id, new.state, 1) ON CONFLICT (user_id, state) '
+    'DO UPDATE SET count = todo_counts.count + 1; END',
+    'CREATE TRIGGER todo_counts_delete AFTER DELETE ON todos BEGIN '
+    'UPDATE todo_counts SET count = count - 1 '
+    'WHERE user_id = old.user_id AND state = old.state; END',
+    'CREATE TRIGGER todo_counts_update AFTER UPDATE OF state, user_id '
+    'ON todos BEGIN '
+    'UPDATE todo_counts SET count = count - 1 '
+    'WHERE user_id = old.user_id AND state = old.state; '
+    'INSERT INTO todo_counts (user_id, state, count) '
+    'VALUES (new.user_id, new.state, 1) ON CONFLICT (user_id, state) '
+    'DO UPDATE SET count = todo_counts.count + 1; END',
+    'CREATE TRIGGER user_count_insert AFTER INSERT ON users BEGIN '
+    'INSERT INTO user_count (id, count) VALUES (1, 1) ON CONFLICT (id) '
+    'DO UPDATE SET count = user_count.count + 1; END',
+    'CREATE TRIGGER user_count_delete AFTER DELETE ON users BEGIN '
+    'UPDATE user_count SET count = count - 1 WHERE id = 1; END',
+]
+POSTGRESQL_COUNTER_DDL = [
+    'CREATE FUNCTION todo_counts_update() RETURNS trigger AS $$ BEGIN '
+    "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+    'UPDATE todo_counts SET count = count - 1 '
+    'WHERE user_id = OLD.user_id AND state = OLD.state; END IF; '
+    "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+    'INSERT INTO todo_counts (user_id, state, count) '
+    'VALUES (NEW.user_id, NEW.state, 1) ON CONFLICT (user_id, state) '
+    'DO UPDATE SET count = todo_counts.count + 1; END IF; '
+    'RETURN NULL; END $$ LANGUAGE plpgsql',
+    'CREATE TRIGGER todo_counts AFTER INSERT OR DELETE OR UPDATE OF state, '
+    'user_id ON todos FOR EACH ROW EXECUTE FUNCTION todo_counts_update()',
+    'CREATE FUNCTION user_count_update() RETURNS trigger AS $$ BEGIN '
+    "IF TG_OP = 'DELETE' THEN "
+    'UPDATE user_count SET count = count - 1 WHERE id = 1; ELSE '
+    'INSERT INTO user_count (id, count) VALUES (1, 1) ON CONFLICT (id) '
+    'DO UPDATE SET count = user_count.count + 1; END IF; '
+    'RETURN NULL; END $$ LANGUAGE plpgsql',
+    'CREATE TRIGGER user_count AFTER INSERT OR DELETE ON users '
+    'FOR EACH ROW EXECUTE FUNCTION user_count_update()',
+]
+COUNTER_DDL = {
+    'sqlite': SQLITE_COUNTER_DDL,
+    'postgresql': POSTGRESQL_COUNTER_DDL,
+}
+
+# os triggers referenciam as duas tabelas, então são criados depois de todas
+for dialect, statements in COUNTER_DDL.items():
+    for statement in statements:
+        event.listen(
+            table_registry.metadata,
+            'after_create',
+            DDL(statement).execute_if(dialect=dialect),
+        )
+for function in ('todo_counts_update', 'user_count_update'):
+    event.listen(
+        table_registry.metadata,
+        'after_drop',
+        DDL(f'DROP FUNCTION IF EXISTS {function}()').execute_if(
+            dialect='postgresql'
+        ),
+    )
+
+
+# Feed de mudanças: triggers dão a cada escrita em `todos` a próxima posição
+# do contador do dono. O SQLite não permite alterar `new`, então o trigger
+# grava a posição com um UPDATE só de `change_seq`, que não dispara de novo
+# nenhum trigger de `todos`.
+SQLITE_CHANGE_SEQ_DDL = [
+    'CREATE TRIGGER todos_change_seq_insert AFTER INSERT ON todos BEGIN '
+    'INSERT INTO change_sequences (user_id, value) VALUES (new.user_id, 1) '
+    'ON CONFLICT (user_id) DO UPDATE SET value = change_sequences.value + 1; '
+    'UPDATE todos SET change_seq = (SELECT value FROM change_sequences '
+    'WHERE user_id = new.user_id) WHERE id = new.id; END',
+    'CREATE TRIGGER todos_change_seq_update AFTER UPDATE OF version '
+    'ON todos BEGIN '
+    'INSERT INTO change_sequences (user_id, value) VALUES (new.user_id, 1) '
+    'ON CONFLICT (user_id) DO UPDATE SET value = change_sequences.value + 1; '
+    'UPDATE todos SET change_seq = (SELECT value FROM change_sequences '
+    'WHERE user_id = new.user_id) WHERE id = new.id; END',
+]
+POSTGRESQL_CHANGE_SEQ_DDL = [
+    'CREATE FUNCTION todos_change_seq() RETURNS trigger AS $$ BEGIN '
+    'INSERT INTO change_sequences (user_id, value) VALUES (NEW.user_id, 1) '
+    'ON CONFLICT (user_id) DO UPDATE SET value = change_sequences.value + 1 '
+    'RETURNING value INTO NEW.change_seq; '
+    'RETURN NEW; END $$ LANGUAGE plpgsql',
+    'CREATE TRIGGER todos_change_seq BEFORE INSERT OR UPDATE OF version '
+    'ON todos FOR EACH ROW EXECUTE FUNCTION todos_change_seq()',
+]
+CHANGE_SEQ_DDL = {
+    'sqlite': SQLITE_CHANGE_SEQ_DDL,
+    'postgresql': POSTGRESQL_CHANGE_SEQ_DDL,
+}
+
+for dialect, statements in CHANGE_SEQ_DDL.items():
+    for statement in statements:
+        event.listen(
+            table_registry.metadata,
+            'after_create',
+            DDL(statement).execute_if(dialect=dialect),
+        )
+event.listen(
+    table_registry.metadata,
+    'after_drop',
+    DDL('DROP FUNCTION IF EXISTS todos_change_seq()').execute_if(
+        dialect='postgresql'
+    ),
+)
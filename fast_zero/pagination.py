@@ -0,0 +1,193 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from fast_zero.schemas import FilterPage
+
+NEXT = 'next'
+PREV = 'prev'
+
+
+@dataclass
+class Page:
+    items: list = field(default_factory=list)
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    has_more: bool = False
+
+
+def sort_keys(
+    page: FilterPage,
+    columns: dict[str, InstrumentedAttribute],
+    primary_key: InstrumentedAttribute,
+) -> tuple[list[InstrumentedAttribute], bool]:
+    """Resolve os campos `sort`/`order` da página em colunas de ordenação
+
+    Args:
+        page (FilterPage): parâmetros de paginação
+        columns (dict[str, InstrumentedAttribute]): colunas permitidas
+        primary_key (InstrumentedAttribute): coluna de desempate
+
+    Returns:
+        tuple[list[InstrumentedAttribute], bool]: colunas e se é decrescente
+    """
+    column = columns.get(page.sort, primary_key)
+    keys = [primary_key] if column is primary_key else [column, primary_key]
+    return keys, page.order == 'desc'
+
+
+def encode_cursor(
+    values: Sequence[Any],
+    direction: str,
+    keys: Sequence[InstrumentedAttribute],
+) -> str:
+    """Gera um cursor opaco a partir dos valores da chave de ordenação
+
+    Args:
+        values (Sequence[Any]): valores da chave da linha de referência
+        direction (str): `next` ou `prev`
+        keys (Sequence[InstrumentedAttribute]): colunas da chave
+
+    Returns:
+        str: cursor codificado em base64
+    """
+    data = json.dumps(
+        {'k': [key.key for key in keys], 'v': list(values), 'd': direction},
+        default=str,
+    )
+    return urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(
+    cursor: str, keys: Sequence[InstrumentedAttribute]
+) -> tuple[list[Any], str]:
+    """Decodifica um cursor gerado por `encode_cursor`
+
+    Args:
+        cursor (str): cursor opaco
+        keys (Sequence[InstrumentedAttribute]): colunas da chave
+
+    Raises:
+        HTTPException: cursor inválido ou de outra ordenação
+
+    Returns:
+        tuple[list[Any], str]: valores da chave e direção
+    """
+    invalid_cursor = HTTPException(
+        status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+    )
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        data = json.loads(urlsafe_b64decode(cursor + padding))
+        names, values, direction = data['k'], data['v'], data['d']
+    except (ValueError, TypeError, KeyError):
+        raise invalid_cursor
+
+    if (
+        direction not in {NEXT, PREV}
+        or names != [key.key for key in keys]
+        or not isinstance(values, list)
+        or len(values) != len(keys)
+    ):
+        raise invalid_cursor
+    try:
+        values = [_from_json(key, value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise invalid_cursor
+    return values, direction
+
+
+def _from_json(key: InstrumentedAttribute, value: Any) -> Any:
+    python_type = key.type.python_type
+    if isinstance(value, python_type):
+        return value
+    if hasattr(python_type, 'fromisoformat'):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def _key_values(row: Any, keys: Sequence[InstrumentedAttribute]) -> list:
+    return [getattr(row, key.key) for key in keys]
+
+
+def _selects_entity(query: Select) -> bool:
+    columns = query.column_descriptions
+    return len(columns) == 1 and columns[0]['expr'] is columns[0]['entity']
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    page: FilterPage,
+    keys: Sequence[InstrumentedAttribute],
+    descending: bool = False,
+) -> Page:
+    """Executa uma consulta paginada.
+
+    Sem cursor, usa `skip`/`limit`. Com cursor, filtra pela chave de
+    ordenação (keyset), de modo que o custo de qualquer página é o mesmo da
+    primeira. A última coluna de `keys` deve ser única (a chave primária)
+    para desempatar a ordenação. Se a consulta seleciona uma entidade os
+    itens são objetos mapeados; se projeta colunas, são linhas, que devem
+    incluir as colunas de `keys`.
+
+    O cursor é comparado direto com as colunas, para que os índices sirvam,
+    então o valor gravado precisa ordenar igual ao valor ligado pelo
+    driver; as datas geradas pelo banco usam `fast_zero.models.utcnow` por
+    isso.
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+        query (Select): consulta já filtrada
+        page (FilterPage): parâmetros de paginação
+        keys (Sequence[InstrumentedAttribute]): colunas da ordenação
+        descending (bool): ordena de forma decrescente
+
+    Returns:
+        Page: itens da página e cursores de navegação
+    """
+    backwards = False
+    if page.cursor:
+        values, direction = decode_cursor(page.cursor, keys)
+        backwards = direction == PREV
+        key = keys[0] if len(keys) == 1 else tuple_(*keys)
+        bound = values[0] if len(keys) == 1 else tuple_(*values)
+        if descending == backwards:
+            query = query.where(key > bound)
+        else:
+            query = query.where(key < bound)
+    else:
+        query = query.offset(page.skip)
+
+    order_desc = descending != backwards
+    query = query.order_by(
+        *(key.desc() if order_desc else key.asc() for key in keys)
+    ).limit(page.limit + 1)
+
+    result = await session.execute(query)
+    rows = list(result.scalars() if _selects_entity(query) else result)
+    has_more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    if backwards:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(page.cursor or page.skip)
+
+    result = Page(items=rows, has_more=has_next)
+    if rows and has_next:
+        result.next_cursor = encode_cursor(
+            _key_values(rows[-1], keys), NEXT, keys
+        )
+    if rows and has_prev:
+        result.prev_cursor = encode_cursor(
+            _key_values(rows[0], keys), PREV, keys
+        )
+    return result
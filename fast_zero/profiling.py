@@ -0,0 +1,371 @@
+import asyncio
+import json
+import sys
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from random import random
+from time import perf_counter, sleep, time_ns
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fast_zero.settings import Settings
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}.{frame.f_code.co_qualname}:{frame.f_lineno}'
+
+
+def _await_stack(coro: Any) -> list[str]:
+    # cadeia de awaits de uma corrotina suspensa, da externa para a interna
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(
+            coro, 'gi_frame', None
+        )
+        if frame is None:
+            break
+        stack.append(_frame_name(frame))
+        coro = getattr(coro, 'cr_await', None) or getattr(
+            coro, 'gi_yieldfrom', None
+        )
+    return stack
+
+
+def _thread_stack(frame: FrameType, outermost: FrameType) -> list[str]:
+    # pilha da thread, da corrotina da tarefa até o frame em execução
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        if frame is outermost:
+            break
+        frame = frame.f_back
+    return stack[::-1]
+
+
+@dataclass
+class QueryRecord:
+    """Comando SQL registrado durante o profiling."""
+
+    statement: str
+    parameters: Any
+    duration_ms: float
+    slow: bool
+    plan: list | None = None
+
+
+@dataclass(eq=False)
+class RequestProfile:
+    """Dados de profiling de uma requisição.
+
+    Só requisições sorteadas (`sampled`) recebem amostras de pilha e têm
+    todos os comandos SQL registrados; nas demais apenas os comandos lentos
+    são guardados.
+    """
+
+    task: asyncio.Task | None
+    thread_id: int
+    sampled: bool
+    queries: list[QueryRecord] = field(default_factory=list)
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+
+    def sample(self, frame: FrameType | None) -> None:
+        """Registra uma amostra da pilha da tarefa da requisição.
+
+        Se a tarefa está executando, a amostra é a pilha da thread do event
+        loop; se está suspensa, é a cadeia de awaits em que ela espera.
+
+        Args:
+            frame (FrameType | None): frame atual da thread do event loop
+        """
+        if self.task is None or self.task.done():
+            return
+        coro = self.task.get_coro()
+        outermost = getattr(coro, 'cr_frame', None)
+        if getattr(coro, 'cr_running', False) and frame is not None:
+            stack = _thread_stack(frame, outermost)
+        else:
+            stack = _await_stack(coro)
+        if stack:
+            self.stacks[';'.join(stack)] += 1
+            self.samples += 1
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    'current_profile', default=None
+)
+
+
+class StackSampler:
+    """Thread que amostra periodicamente as pilhas das requisições ativas.
+
+    A thread só acorda a cada `interval` segundos enquanto há requisições
+    sendo amostradas; sem elas, fica parada esperando a próxima.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active: set[RequestProfile] = set()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, profile: RequestProfile) -> None:
+        self.active.add(profile)
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='stack-sampler', daemon=True
+            )
+            self._thread.start()
+        self._wake.set()
+
+    def discard(self, profile: RequestProfile) -> None:
+        self.active.discard(profile)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if not self.active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            sleep(self.interval)
+            frames = sys._current_frames()
+            for profile in list(self.active):
+                profile.sample(frames.get(profile.thread_id))
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+
+class ProfileStore:
+    """Diretório de relatórios em JSON, mantendo só os `max_files` mais
+    recentes."""
+
+    def __init__(self, directory: Path, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def write(self, kind: str, report: dict) -> Path:
+        """Grava um relatório e remove os mais antigos além do limite
+
+        Args:
+            kind (str): tipo do relatório, usado no nome do arquivo
+            report (dict): conteúdo do relatório
+
+        Returns:
+            Path: arquivo gravado
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{time_ns()}-{kind}.json'
+        path.write_text(json.dumps(report, indent=2, default=repr))
+        reports = sorted(self.directory.glob('*.json'))
+        for old in reports[: max(len(reports) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+        return path
+
+
+class Profiler:
+    """Profiling opcional de requisições e comandos SQL lentos.
+
+    Uma fração `sample_rate` das requisições tem a pilha amostrada a cada
+    `interval_ms`; as que passam de `slow_request_ms` geram um relatório
+    com as pilhas agregadas (no formato "folded" dos flame graphs) e os
+    comandos SQL executados. Comandos acima de `slow_query_ms` são sempre
+    registrados com os parâmetros e o plano do `EXPLAIN`.
+
+    As amostras vêm da thread do event loop, então só mostram código
+    assíncrono da própria tarefa; trabalho em threads auxiliares, como o
+    hash de senhas, aparece como espera.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        sample_rate: float,
+        slow_request_ms: float,
+        slow_query_ms: float,
+        interval_ms: float,
+    ):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+        self.slow_query_ms = slow_query_ms
+        self.sampler = StackSampler(interval_ms / 1000)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Registra os comandos SQL da engine no profiling
+
+        Args:
+            engine (AsyncEngine): engine do banco de dados
+        """
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            conn.info.setdefault('profile_start', []).append(perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, parameters, *args):
+            start = conn.info['profile_start'].pop()
+            elapsed = (perf_counter() - start) * 1000
+            profile = current_profile.get()
+            slow = elapsed >= self.slow_query_ms
+            if not slow and (profile is None or not profile.sampled):
+                return
+            record = QueryRecord(statement, parameters, elapsed, slow)
+            if slow and not args[-1]:  # executemany
+                record.plan = explain(conn, statement, parameters)
+            if profile is not None:
+                profile.queries.append(record)
+            else:
+                self.store.write('query', {'queries': [asdict(record)]})
+
+        event.listen(
+            engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+        )
+        event.listen(
+            engine.sync_engine, 'after_cursor_execute', after_cursor_execute
+        )
+
+    def report(
+        self,
+        scope: Scope,
+        profile: RequestProfile,
+        status: int,
+        duration_ms: float,
+    ) -> tuple[str, dict] | None:
+        """Monta o relatório de uma requisição, se houver o que registrar
+
+        Args:
+            scope (Scope): escopo ASGI da requisição
+            profile (RequestProfile): dados coletados
+            status (int): status da resposta
+            duration_ms (float): duração da requisição
+
+        Returns:
+            tuple[str, dict] | None: tipo e conteúdo do relatório
+        """
+        route = scope.get('route')
+        report = {
+            'method': scope['method'],
+            'path': scope['path'],
+            'route': route.path if route is not None else None,
+            'status': status,
+            'duration_ms': duration_ms,
+            'finished_at': datetime.now(UTC).isoformat(),
+        }
+        if profile.sampled and duration_ms >= self.slow_request_ms:
+            report['profile'] = {
+                'interval_ms': self.sampler.interval * 1000,
+                'samples': profile.samples,
+                'stacks': dict(profile.stacks.most_common()),
+            }
+            report['queries'] = [asdict(query) for query in profile.queries]
+            return 'request', report
+
+        slow_queries = [
+            asdict(query) for query in profile.queries if query.slow
+        ]
+        if slow_queries:
+            report['queries'] = slow_queries
+            return 'query', report
+        return None
+
+    def shutdown(self) -> None:
+        self.sampler.shutdown()
+
+
+def explain(conn, statement: str, parameters: Any) -> list | None:
+    """Obtém o plano de execução de um comando pela conexão DBAPI
+
+    Usa um cursor próprio para não disparar os eventos da engine. Falhas
+    viram parte do plano: o profiling nunca interrompe a requisição.
+
+    Args:
+        conn (Connection): conexão em que o comando rodou
+        statement (str): comando SQL
+        parameters (Any): parâmetros do comando
+
+    Returns:
+        list | None: linhas do plano, ou None se o banco não for suportado
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(
+        EXPLAINABLE
+    ):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [list(row) for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN failed: {error!r}']
+    finally:
+        cursor.close()
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que coleta e grava os relatórios do `Profiler`."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            task=asyncio.current_task(),
+            thread_id=threading.get_ident(),
+            sampled=random() < self.profiler.sample_rate,
+        )
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        token = current_profile.set(profile)
+        if profile.sampled:
+            self.profiler.sampler.add(profile)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (perf_counter() - start) * 1000
+            self.profiler.sampler.discard(profile)
+            current_profile.reset(token)
+            report = self.profiler.report(scope, profile, status, duration_ms)
+            if report is not None:
+                await asyncio.to_thread(self.profiler.store.write, *report)
+
+
+settings = Settings()
+profiler = Profiler(
+    store=ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES),
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    slow_request_ms=settings.PROFILING_SLOW_REQUEST_MS,
+    slow_query_ms=settings.PROFILING_SLOW_QUERY_MS,
+    interval_ms=settings.PROFILING_INTERVAL_MS,
+)
@@ -0,0 +1,295 @@
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from fast_zero.cache import TTLCache
+from fast_zero.database import pool_metrics, pool_stats
+from fast_zero.events import Broker, InMemoryBroker
+from fast_zero.hashing import PasswordHasher, password_hasher
+from fast_zero.metrics import (
+    Histogram,
+    HTTPMetrics,
+    LatencyStats,
+    http_metrics,
+)
+from fast_zero.query_stats import route_query_metrics
+from fast_zero.security import principal_cache, token_cache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'fast_zero_'
+
+Labels = dict[str, str]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _ratio(hits: int, misses: int) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f'{{{pairs}}}'
+
+
+class MetricsWriter:
+    """Monta o texto no formato de exposição do Prometheus."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def _header(self, name: str, kind: str, description: str) -> str:
+        name = PREFIX + name
+        self.lines.append(f'# HELP {name} {description}')
+        self.lines.append(f'# TYPE {name} {kind}')
+        return name
+
+    def metric(
+        self,
+        name: str,
+        kind: str,
+        description: str,
+        samples: Iterable[tuple[Labels, float]],
+    ) -> None:
+        """Escreve um contador ou gauge.
+
+        Args:
+            name (str): nome sem o prefixo da aplicação
+            kind (str): `counter` ou `gauge`
+            description (str): texto do `# HELP`
+            samples (Iterable[tuple[Labels, float]]): labels e valores
+        """
+        name = self._header(name, kind, description)
+        self.lines.extend(
+            f'{name}{_labels(labels)} {value}' for labels, value in samples
+        )
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        series: Iterable[tuple[Labels, Histogram]],
+    ) -> None:
+        """Escreve um histograma.
+
+        Args:
+            name (str): nome sem o prefixo da aplicação
+            description (str): texto do `# HELP`
+            series (Iterable[tuple[Labels, Histogram]]): labels e histogramas
+        """
+        name = self._header(name, 'histogram', description)
+        for labels, histogram in series:
+            for bound, count in histogram.cumulative():
+                bucket = _labels({**labels, 'le': bound})
+                self.lines.append(f'{name}_bucket{bucket} {count}')
+            self.lines.append(f'{name}_sum{_labels(labels)} {histogram.sum}')
+            self.lines.append(
+                f'{name}_count{_labels(labels)} {histogram.count}'
+            )
+
+    def summary(
+        self,
+        name: str,
+        description: str,
+        series: Iterable[tuple[Labels, LatencyStats]],
+    ) -> None:
+        """Escreve um `LatencyStats` como summary sem quantis.
+
+        Args:
+            name (str): nome sem o prefixo da aplicação
+            description (str): texto do `# HELP`
+            series (Iterable[tuple[Labels, LatencyStats]]): labels e
+                estatísticas
+        """
+        name = self._header(name, 'summary', description)
+        for labels, stats in series:
+            self.lines.append(f'{name}_sum{_labels(labels)} {stats.total}')
+            self.lines.append(f'{name}_count{_labels(labels)} {stats.count}')
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+def write_http(writer: MetricsWriter, metrics: HTTPMetrics) -> None:
+    writer.metric(
+        'http_requests_in_flight',
+        'gauge',
+        'Requisições HTTP em andamento',
+        [({}, metrics.in_flight)],
+    )
+    routes = [
+        ({'method': method, 'route': path}, route)
+        for (method, path), route in sorted(metrics.routes.items())
+    ]
+    writer.histogram(
+        'http_request_duration_seconds',
+        'Latência das requisições HTTP por rota',
+        [(labels, route.latency) for labels, route in routes],
+    )
+    writer.metric(
+        'http_responses_total',
+        'counter',
+        'Respostas HTTP por rota e classe de status',
+        [
+            ({**labels, 'status': status}, count)
+            for labels, route in routes
+            for status, count in route.responses.items()
+        ],
+    )
+
+
+def write_pool(writer: MetricsWriter, engine: AsyncEngine) -> None:
+    stats = pool_stats(engine)
+    for key, description in (
+        ('checked_out', 'Conexões do pool em uso'),
+        ('capacity', 'Conexões máximas do pool, incluindo overflow'),
+        ('saturation', 'Fração da capacidade do pool em uso'),
+    ):
+        if key in stats:
+            writer.metric(
+                f'db_pool_{key}', 'gauge', description, [({}, stats[key])]
+            )
+    writer.summary(
+        'db_pool_checkout_wait_seconds',
+        'Espera por uma conexão do pool',
+        [({}, pool_metrics.checkout_wait)],
+    )
+    writer.metric(
+        'db_pool_timeouts_total',
+        'counter',
+        'Checkouts que estouraram o timeout do pool',
+        [({}, stats['timeouts'])],
+    )
+
+
+def write_hasher(writer: MetricsWriter, hasher: PasswordHasher) -> None:
+    writer.metric(
+        'password_hash_pending',
+        'gauge',
+        'Hashes e verificações de senha em execução ou na fila',
+        [({}, hasher.pending)],
+    )
+    writer.metric(
+        'password_hash_max_pending',
+        'gauge',
+        'Limite de chamadas pendentes do pool de hash',
+        [({}, hasher.max_pending)],
+    )
+    writer.metric(
+        'password_hash_rejected_total',
+        'counter',
+        'Chamadas rejeitadas com o pool de hash saturado',
+        [({}, hasher.rejected)],
+    )
+    writer.summary(
+        'password_hash_duration_seconds',
+        'Duração do hash e da verificação de senhas, incluindo a fila',
+        [
+            ({'operation': 'hash'}, hasher.hash_latency),
+            ({'operation': 'verify'}, hasher.verify_latency),
+        ],
+    )
+
+
+def write_caches(writer: MetricsWriter, caches: dict[str, TTLCache]) -> None:
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    for key, kind, description in (
+        ('hits', 'counter', 'Consultas ao cache encontradas'),
+        ('misses', 'counter', 'Consultas ao cache ausentes ou expiradas'),
+    ):
+        writer.metric(
+            f'cache_{key}_total',
+            kind,
+            description,
+            [({'cache': name}, value[key]) for name, value in stats.items()],
+        )
+    writer.metric(
+        'cache_size',
+        'gauge',
+        'Entradas no cache',
+        [({'cache': name}, value['size']) for name, value in stats.items()],
+    )
+    writer.metric(
+        'cache_hit_ratio',
+        'gauge',
+        'Fração das consultas ao cache encontradas',
+        [
+            ({'cache': name}, _ratio(value['hits'], value['misses']))
+            for name, value in stats.items()
+        ],
+    )
+
+
+def write_events(writer: MetricsWriter, broker: InMemoryBroker) -> None:
+    stats = broker.stats()
+    writer.metric(
+        'events_channels',
+        'gauge',
+        'Canais de eventos com assinantes',
+        [({}, stats['channels'])],
+    )
+    writer.metric(
+        'events_subscribers',
+        'gauge',
+        'Conexões SSE assinando eventos',
+        [({}, stats['subscribers'])],
+    )
+    writer.metric(
+        'events_dropped_total',
+        'counter',
+        'Eventos descartados por assinantes lentos',
+        [({}, stats['dropped'])],
+    )
+
+
+def write_queries(writer: MetricsWriter) -> None:
+    routes = [
+        ({'method': method, 'route': path}, metrics)
+        for (method, path), metrics in sorted(route_query_metrics.items())
+    ]
+    writer.metric(
+        'db_statements_total',
+        'counter',
+        'Comandos SQL enviados por rota',
+        [(labels, metrics.statements) for labels, metrics in routes],
+    )
+    writer.metric(
+        'db_statements_max',
+        'gauge',
+        'Maior número de comandos SQL em uma requisição da rota',
+        [(labels, metrics.max_statements) for labels, metrics in routes],
+    )
+    writer.summary(
+        'db_request_time_seconds',
+        'Tempo no banco por requisição da rota',
+        [(labels, metrics.db_time) for labels, metrics in routes],
+    )
+
+
+def render_metrics(engine: AsyncEngine, broker: Broker) -> str:
+    """Coleta as métricas da aplicação no formato do Prometheus
+
+    Só lê contadores já mantidos pelos componentes; nada é calculado por
+    requisição além da própria exposição.
+
+    Args:
+        engine (AsyncEngine): engine cujo pool é reportado
+        broker (Broker): broker de eventos da aplicação
+
+    Returns:
+        str: corpo da resposta de `/metrics`
+    """
+    writer = MetricsWriter()
+    write_http(writer, http_metrics)
+    write_pool(writer, engine)
+    write_hasher(writer, password_hasher)
+    write_caches(writer, {'principal': principal_cache, 'token': token_cache})
+    if isinstance(broker, InMemoryBroker):
+        write_events(writer, broker)
+    write_queries(writer)
+    return writer.render()
@@ -0,0 +1,184 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fast_zero.metrics import OTHER_METHOD, UNMATCHED_ROUTE, LatencyStats
+
+
+@dataclass
+class QueryStats:
+    """Comandos SQL executados durante uma requisição."""
+
+    count: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+    slowest_statement: str | None = None
+
+    def observe(self, statement: str, seconds: float) -> None:
+        """Registra a execução de um comando.
+
+        Args:
+            statement (str): comando SQL
+            seconds (float): duração em segundos
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds >= self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Formata as estatísticas para o cabeçalho `Server-Timing`.
+
+        Returns:
+            str: valor do cabeçalho
+        """
+        return (
+            f'db;dur={self.total * 1000:.2f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest * 1000:.2f}'
+        )
+
+
+@dataclass
+class RouteQueryMetrics:
+    """Agregado dos comandos SQL por rota."""
+
+    requests: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    db_time: LatencyStats = field(default_factory=LatencyStats)
+
+    def observe(self, stats: QueryStats) -> None:
+        """Acumula as estatísticas de uma requisição.
+
+        Args:
+            stats (QueryStats): comandos da requisição
+        """
+        self.requests += 1
+        self.statements += stats.count
+        self.max_statements = max(self.max_statements, stats.count)
+        self.db_time.observe(stats.total)
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            'requests': self.requests,
+            'statements': self.statements,
+            'mean_statements': (
+                self.statements / self.requests if self.requests else 0.0
+            ),
+            'max_statements': self.max_statements,
+            'db_time': self.db_time.snapshot(),
+        }
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    'current_query_stats', default=None
+)
+unmatched_query_metrics = RouteQueryMetrics()
+route_query_metrics: dict[tuple[str, str], RouteQueryMetrics] = {
+    (OTHER_METHOD, UNMATCHED_ROUTE): unmatched_query_metrics
+}
+
+
+def register_query_routes(routes: Iterable[BaseRoute]) -> None:
+    """Registra os agregados de cada método e caminho das rotas
+
+    Só rotas registradas têm agregado próprio; as demais requisições vão
+    para `unmatched`, já que o método vem do cliente.
+
+    Args:
+        routes (Iterable[BaseRoute]): rotas da aplicação
+    """
+    for route in routes:
+        for method in getattr(route, 'methods', None) or ():
+            route_query_metrics.setdefault(
+                (method, route.path), RouteQueryMetrics()
+            )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Mede os comandos enviados pela engine para a requisição corrente
+
+    Comandos executados fora de uma requisição (sem `QueryStats` no
+    contexto) são ignorados.
+
+    Args:
+        engine (AsyncEngine): engine do banco de dados
+    """
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, *args):
+        elapsed = perf_counter() - conn.info['query_start'].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.observe(statement, elapsed)
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    event.listen(
+        engine.sync_engine, 'after_cursor_execute', after_cursor_execute
+    )
+
+
+def query_metrics() -> dict[str, dict]:
+    """Retorna os agregados de comandos SQL por rota
+
+    Returns:
+        dict[str, dict]: métricas por `MÉTODO /caminho`
+    """
+    return {
+        f'{method} {path}': metrics.snapshot()
+        for (method, path), metrics in route_query_metrics.items()
+    }
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI que mede os comandos SQL de cada requisição.
+
+    Acumula as métricas por rota e, com `debug`, envia o cabeçalho
+    `Server-Timing` com o tempo total no banco e o comando mais lento. O
+    cabeçalho sai no início da resposta, então em respostas em streaming
+    não inclui os comandos executados durante o envio do corpo.
+    """
+
+    def __init__(self, app: ASGIApp, debug: bool = False):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # se um middleware externo já mede a requisição, ele é quem reporta
+        if scope['type'] != 'http' or current_query_stats.get() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start' and self.debug:
+                headers = list(message.get('headers', []))
+                headers.append((
+                    b'server-timing',
+                    stats.server_timing().encode(),
+                ))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            route = scope.get('route')
+            path = route.path if route is not None else None
+            route_query_metrics.get(
+                (scope['method'], path), unmatched_query_metrics
+            ).observe(stats)
@@ -7,12 +7,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
+from fast_zero.hashing import password_hasher
 from fast_zero.models import User
 from fast_zero.schemas import Token
-from fast_zero.security import create_token, get_current_user, verify_password
+from fast_zero.security import Principal, create_token, get_current_user
 
 router = APIRouter(prefix='/auth', tags=['auth'])
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 Session = Annotated[AsyncSession, Depends(get_session)]
 
@@ -26,7 +27,7 @@ async def login_for_access_token(form_data: OAuth2Form, session: Session):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED, detail='Invalid credentials'
         )
-    if not verify_password(form_data.password, user.password):
+    if not await password_hasher.verify(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED, detail='Invalid credentials'
         )
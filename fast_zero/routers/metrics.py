@@ -0,0 +1,15 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response
+
+from fast_zero.database import engine
+from fast_zero.events import Broker, get_broker
+from fast_zero.prometheus import CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=['metrics'])
+Events = Annotated[Broker, Depends(get_broker)]
+
+
+@router.get('/metrics', include_in_schema=False)
+async def read_metrics(broker: Events):
+    return Response(render_metrics(engine, broker), media_type=CONTENT_TYPE)
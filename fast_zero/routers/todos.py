@@ -1,30 +1,191 @@
 from http import HTTPStatus
-from typing import Annotated, Sequence
+from typing import Annotated, Any, Literal, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row, Select, Subquery, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.caching import etag_matches, not_modified, page_etag
+from fast_zero.counters import todo_counts
 from fast_zero.database import get_session
-from fast_zero.models import Todo, User
+from fast_zero.events import Broker, get_broker, sse_stream
+from fast_zero.models import Todo
+from fast_zero.pagination import (
+    NEXT,
+    Page,
+    encode_cursor,
+    paginate,
+    sort_keys,
+)
 from fast_zero.schemas import (
+    BulkItemError,
+    FilterChanges,
+    FilterPage,
     FilterTodo,
+    ImportRowError,
+    TodoBulkResult,
+    TodoBulkUpdate,
+    TodoBulkUpdateResult,
+    TodoChange,
+    TodoChanges,
+    TodoEvent,
+    TodoImportResult,
     TodoList,
     TodoPublic,
     TodoSchema,
     TodoUpdate,
 )
-from fast_zero.security import get_current_user
+from fast_zero.search import todo_search
+from fast_zero.security import Principal, get_current_user
+from fast_zero.serialization import (
+    construct,
+    distinct_columns,
+    json_response,
+    schema_columns,
+)
+from fast_zero.settings import Settings
+from fast_zero.streaming import MEDIA_TYPES, parse_records, stream_rows
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 Session = Annotated[AsyncSession, Depends(get_session)]
+Events = Annotated[Broker, Depends(get_broker)]
 
 router = APIRouter(prefix='/todos', tags=['todos'])
+SORT_COLUMNS = {
+    'title': Todo.title,
+    'state': Todo.state,
+    'create_at': Todo.create_at,
+    'updated_at': Todo.updated_at,
+}
+# `create_at` distingue um todo novo que reaproveitou o id de um removido
+ETAG_COLUMNS = (Todo.id, Todo.version, Todo.create_at)
+CHANGE_KEYS = (Todo.change_seq, Todo.id)
+# as listagens selecionam só as colunas da resposta e da ETag, sem montar
+# entidades no identity map
+LIST_COLUMNS = distinct_columns(
+    *schema_columns(TodoPublic, Todo), *ETAG_COLUMNS
+)
+CHANGE_COLUMNS = distinct_columns(
+    *schema_columns(TodoChange, Todo), *CHANGE_KEYS
+)
+# as listas são por usuário: o cliente guarda, mas sempre revalida
+CACHE_CONTROL = 'private, no-cache'
+settings = Settings()
+
+
+def check_batch_size(size: int) -> None:
+    if size > settings.TODO_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.TODO_BULK_MAX_ITEMS} items per request',
+        )
+
+
+async def insert_todos(
+    session: AsyncSession, user_id: int, todos: Sequence[TodoSchema]
+) -> list[Todo]:
+    """Insere vários todos em um único INSERT ... RETURNING
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+        user_id (int): dono dos todos
+        todos (Sequence[TodoSchema]): todos já validados
+
+    Returns:
+        list[Todo]: todos criados
+    """
+    if not todos:
+        return []
+    created = await session.scalars(
+        insert(Todo).returning(Todo),
+        [{**todo.model_dump(), 'user_id': user_id} for todo in todos],
+    )
+    return sorted(created.all(), key=lambda todo: todo.id)
+
+
+async def relevance_page(
+    session: AsyncSession, query: Select, page: FilterPage
+) -> Page:
+    """Pagina por skip/limit uma consulta já ordenada por relevância
+
+    Busca uma linha a mais para saber se há próxima página.
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+        query (Select): consulta ordenada
+        page (FilterPage): parâmetros de paginação
+
+    Returns:
+        Page: itens da página, sem cursores
+    """
+    rows = list(
+        await session.execute(query.offset(page.skip).limit(page.limit + 1))
+    )
+    return Page(items=rows[: page.limit], has_more=len(rows) > page.limit)
+
+
+async def list_totals(
+    session: AsyncSession,
+    user_id: int,
+    todo_filter: FilterTodo,
+    search: Subquery | None,
+) -> dict[str, Any]:
+    """Totais da listagem lidos dos contadores, sem `COUNT(*)`
+
+    Com busca textual não há contador para o total filtrado, então só as
+    contagens por estado são devolvidas.
+
+    Args:
+        session (AsyncSession): sessão do banco de dados
+        user_id (int): dono dos todos
+        todo_filter (FilterTodo): filtros da listagem
+        search (Subquery | None): busca textual, se houver
+
+    Returns:
+        dict[str, Any]: `counts` por estado e, se possível, `total`
+    """
+    counts = await todo_counts(session, user_id)
+    totals: dict[str, Any] = {'counts': counts}
+    if search is None and todo_filter.state:
+        totals['total'] = counts[todo_filter.state]
+    elif search is None:
+        totals['total'] = sum(counts.values())
+    return totals
+
+
+async def publish_todos(
+    broker: Broker, user_id: int, event: str, todos: Sequence[Todo]
+) -> None:
+    """Publica todos gravados para os assinantes do dono
+
+    A carga é serializada uma vez, e só se houver quem a receba.
+
+    Args:
+        broker (Broker): broker de eventos
+        user_id (int): dono dos todos
+        event (str): `todos.created` ou `todos.updated`
+        todos (Sequence[Todo]): todos já confirmados no banco
+    """
+    if not todos or not broker.has_subscribers(user_id):
+        return
+    data = TodoEvent.model_validate({'todos': todos}, from_attributes=True)
+    await broker.publish(user_id, event, data.model_dump_json())
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=TodoPublic)
 async def create_todo(
-    todo: TodoSchema, user: CurrentUser, session: Session
+    todo: TodoSchema, user: CurrentUser, session: Session, broker: Events
 ) -> Todo:
     new_todo = Todo(
         title=todo.title,
@@ -34,54 +195,307 @@ async def create_todo(
     )
     session.add(new_todo)
     await session.commit()
-    await session.refresh(new_todo)
+    await publish_todos(broker, user.id, 'todos.created', [new_todo])
 
     return new_todo
 
 
-@router.get('/', status_code=HTTPStatus.OK, response_model=TodoList)
+@router.post(
+    '/bulk', status_code=HTTPStatus.CREATED, response_model=TodoBulkResult
+)
+async def create_todos_bulk(
+    items: Annotated[list[Any], Body()],
+    user: CurrentUser,
+    session: Session,
+    broker: Events,
+) -> dict[str, list]:
+    check_batch_size(len(items))
+
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append(TodoSchema.model_validate(item))
+        except ValidationError as error:
+            details = error.errors(include_url=False, include_context=False)
+            errors.append(BulkItemError(index=index, errors=details))
+
+    todos = await insert_todos(session, user.id, valid)
+    await session.commit()
+    await publish_todos(broker, user.id, 'todos.created', todos)
+
+    return {'todos': todos, 'errors': errors}
+
+
+@router.post(
+    '/import', status_code=HTTPStatus.OK, response_model=TodoImportResult
+)
+async def import_todos(
+    request: Request,
+    user: CurrentUser,
+    session: Session,
+    broker: Events,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+) -> dict[str, int | list]:
+    imported, failed = 0, 0
+    batch, errors = [], []
+    records = parse_records(
+        request.stream(), format, settings.IMPORT_MAX_RECORD_LENGTH
+    )
+    async for line, record in records:
+        details = None
+        if isinstance(record, ValueError):
+            details = [{'msg': str(record)}]
+        else:
+            try:
+                batch.append(TodoSchema.model_validate(record))
+            except ValidationError as error:
+                details = error.errors(
+                    include_url=False,
+                    include_context=False,
+                    include_input=False,
+                )
+
+        if details is not None:
+            failed += 1
+            if len(errors) < settings.IMPORT_MAX_ERRORS:
+                errors.append(ImportRowError(line=line, errors=details))
+
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            todos = await insert_todos(session, user.id, batch)
+            await session.commit()
+            await publish_todos(broker, user.id, 'todos.created', todos)
+            imported += len(todos)
+            batch = []
+
+    todos = await insert_todos(session, user.id, batch)
+    await session.commit()
+    await publish_todos(broker, user.id, 'todos.created', todos)
+    imported += len(todos)
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+@router.patch(
+    '/bulk', status_code=HTTPStatus.OK, response_model=TodoBulkUpdateResult
+)
+async def update_todos_bulk(
+    bulk: TodoBulkUpdate, user: CurrentUser, session: Session, broker: Events
+) -> dict[str, int | list[int]]:
+    query = update(Todo).where(Todo.user_id == user.id)
+    if bulk.ids is not None:
+        check_batch_size(len(bulk.ids))
+        query = query.where(Todo.id.in_(bulk.ids))
+
+    if bulk.filter is not None:
+        search = todo_search(
+            session.bind.dialect.name,
+            bulk.filter.title,
+            bulk.filter.description,
+        )
+        if search is not None:
+            query = query.where(Todo.id.in_(select(search.c.id)))
+        if bulk.filter.state:
+            query = query.where(Todo.state == bulk.filter.state)
+
+    query = query.values(
+        **bulk.changes.model_dump(exclude_unset=True),
+        version=Todo.version + 1,
+    )
+    # as linhas completas só são carregadas se alguém vai recebê-las
+    if broker.has_subscribers(user.id):
+        todos = (await session.scalars(query.returning(Todo))).all()
+        todos = sorted(todos, key=lambda todo: todo.id)
+        ids = [todo.id for todo in todos]
+    else:
+        todos = []
+        ids = sorted((await session.scalars(query.returning(Todo.id))).all())
+    await session.commit()
+    await publish_todos(broker, user.id, 'todos.updated', todos)
+
+    return {'updated': len(ids), 'ids': ids}
+
+
+@router.get(
+    '/',
+    status_code=HTTPStatus.OK,
+    response_model=TodoList,
+    response_model_exclude_none=True,
+)
 async def list_todos(
     user: CurrentUser,
     session: Session,
     todo_filter: Annotated[FilterTodo, Query()],
-) -> dict[str, Sequence[Todo]]:
-    query = select(Todo).where(Todo.user_id == user.id)
-    if todo_filter.title:
-        query = query.filter(Todo.title.contains(todo_filter.title))
-
-    if todo_filter.description:
-        query = query.filter(
-            Todo.description.contains(todo_filter.description)
-        )
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> dict[str, Any] | Response:
+    query = select(*LIST_COLUMNS).where(Todo.user_id == user.id)
+    search = todo_search(
+        session.bind.dialect.name, todo_filter.title, todo_filter.description
+    )
+    if search is not None:
+        query = query.join(search, search.c.id == Todo.id)
 
     if todo_filter.state:
         query = query.filter(Todo.state == todo_filter.state)
 
-    todos = await session.scalars(
-        query.offset(todo_filter.skip).limit(todo_filter.limit)
+    meta = {}
+    if todo_filter.meta:
+        meta = await list_totals(session, user.id, todo_filter, search)
+
+    if search is not None and not todo_filter.sort:
+        # a relevância não é estável entre escritas, então a busca sem
+        # ordenação explícita pagina por skip/limit
+        query = query.order_by(search.c.rank, Todo.id)
+        if if_none_match:
+            versions = await relevance_page(
+                session, query.with_only_columns(*ETAG_COLUMNS), todo_filter
+            )
+            etag = page_etag(versions, ETAG_COLUMNS, meta)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, CACHE_CONTROL)
+
+        page = await relevance_page(session, query, todo_filter)
+    else:
+        keys, descending = sort_keys(todo_filter, SORT_COLUMNS, Todo.id)
+        if if_none_match:
+            # verificação barata: a mesma página, mas só com as colunas de
+            # versão e da chave de ordenação
+            versions = await paginate(
+                session,
+                query.with_only_columns(
+                    *distinct_columns(*ETAG_COLUMNS, *keys)
+                ),
+                todo_filter,
+                keys,
+                descending,
+            )
+            etag = page_etag(versions, ETAG_COLUMNS, meta)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, CACHE_CONTROL)
+
+        page = await paginate(
+            session,
+            query.with_only_columns(*distinct_columns(*LIST_COLUMNS, *keys)),
+            todo_filter,
+            keys,
+            descending,
+        )
+
+    headers = {
+        'ETag': page_etag(page, ETAG_COLUMNS, meta),
+        'Cache-Control': CACHE_CONTROL,
+    }
+    if todo_filter.meta:
+        meta['has_more'] = page.has_more
+    if settings.FAST_SERIALIZATION:
+        # as linhas vêm do nosso banco: serializa sem revalidar cada item
+        content = TodoList.model_construct(
+            todos=construct(TodoPublic, page.items),
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            **meta,
+        )
+        return json_response(content, headers, exclude_none=True)
+
+    response.headers.update(headers)
+    return {
+        'todos': page.items,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        **meta,
+    }
+
+
+@router.get('/export', status_code=HTTPStatus.OK)
+async def export_todos(
+    user: CurrentUser,
+    session: Session,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+) -> StreamingResponse:
+    query = (
+        select(Todo.id, Todo.title, Todo.description, Todo.state)
+        .where(Todo.user_id == user.id)
+        .order_by(Todo.id)
+    )
+    return StreamingResponse(
+        stream_rows(session.bind, query, format, settings.EXPORT_CHUNK_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename="todos.{format}"'
+        },
+    )
+
+
+@router.get('/changes', status_code=HTTPStatus.OK, response_model=TodoChanges)
+async def list_todo_changes(
+    user: CurrentUser,
+    session: Session,
+    changes: Annotated[FilterChanges, Query()],
+) -> dict[str, Sequence[Row] | str | bool | None]:
+    # o token é um cursor sobre (change_seq, id) da última linha entregue:
+    # toda escrita confirmada depois tem `change_seq` maior (ver
+    # `fast_zero.models.ChangeSequence`), então nada se perde nem se
+    # repete, por maior que seja a escrita em massa. Mover para a lixeira
+    # também é uma escrita, então aparece no feed
+    query = select(*CHANGE_COLUMNS).where(Todo.user_id == user.id)
+    page = await paginate(
+        session,
+        query,
+        FilterPage(limit=changes.limit, cursor=changes.since),
+        CHANGE_KEYS,
     )
 
-    return {'todos': todos.all()}
+    token = changes.since
+    if page.items:
+        last = page.items[-1]
+        token = encode_cursor([last.change_seq, last.id], NEXT, CHANGE_KEYS)
+
+    return {
+        'todos': page.items,
+        'next_token': token,
+        'has_more': page.next_cursor is not None,
+    }
+
+
+@router.get('/events', status_code=HTTPStatus.OK)
+async def stream_todo_events(
+    user: CurrentUser, broker: Events
+) -> StreamingResponse:
+    return StreamingResponse(
+        sse_stream(broker, user.id, settings.EVENTS_HEARTBEAT_SECONDS),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 @router.patch(
     '/{todo_id}', status_code=HTTPStatus.OK, response_model=TodoPublic
 )
 async def update_todo(
-    todo_id: int, user: CurrentUser, session: Session, todo: TodoUpdate
+    todo_id: int,
+    user: CurrentUser,
+    session: Session,
+    broker: Events,
+    todo: TodoUpdate,
 ) -> Todo:
-    query = select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
+    changes = todo.model_dump(exclude_unset=True)
+    if changes:
+        query = (
+            update(Todo)
+            .where(Todo.id == todo_id, Todo.user_id == user.id)
+            .values(**changes, version=Todo.version + 1)
+            .returning(Todo)
+        )
+    else:
+        query = select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
+
     existing_todo = await session.scalar(query)
     if not existing_todo:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Todo not found'
         )
-
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(existing_todo, key, value)
-
-    session.add(existing_todo)
     await session.commit()
-    await session.refresh(existing_todo)
+    if changes:
+        await publish_todos(broker, user.id, 'todos.updated', [existing_todo])
 
     return existing_todo
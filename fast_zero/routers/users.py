@@ -1,25 +1,61 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.caching import (
+    etag_matches,
+    not_modified,
+    page_etag,
+    rows_etag,
+)
+from fast_zero.counters import user_total
 from fast_zero.database import get_session
-from fast_zero.models import User
-from fast_zero.schemas import FilterPage, UserList, UserPublic, UserSchema
-from fast_zero.security import get_current_user, get_password_hash
+from fast_zero.hashing import password_hasher
+from fast_zero.models import ChangeSequence, Todo, TodoCount, User
+from fast_zero.pagination import paginate, sort_keys
+from fast_zero.schemas import FilterUser, UserList, UserPublic, UserSchema
+from fast_zero.security import (
+    Principal,
+    get_current_user,
+    principal_cache,
+)
+from fast_zero.serialization import (
+    construct,
+    distinct_columns,
+    json_response,
+    schema_columns,
+)
+from fast_zero.settings import Settings
 
 router = APIRouter(prefix='/users', tags=['users'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+SORT_COLUMNS = {
+    'username': User.username,
+    'email': User.email,
+    'create_at': User.create_at,
+    'updated_at': User.updated_at,
+}
+# `create_at` distingue um usuário novo que reaproveitou o id de um removido
+ETAG_COLUMNS = (User.id, User.version, User.create_at)
+CACHE_CONTROL = 'no-cache'
+IfNoneMatch = Annotated[str | None, Header()]
+# leituras selecionam só as colunas da resposta e da ETag: nunca o hash
+# da senha, e sem montar entidades no identity map
+LIST_COLUMNS = distinct_columns(
+    *schema_columns(UserPublic, User), *ETAG_COLUMNS
+)
+settings = Settings()
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
 async def create_user(user: UserSchema, session: Session):
     query = await session.scalar(
-        select(User).where(
+        select(User.id).where(
             (User.username == user.username) | (User.email == user.email)
         )
     )
@@ -29,29 +65,94 @@ async def create_user(user: UserSchema, session: Session):
             status_code=HTTPStatus.CONFLICT, detail=error_message
         )
     new_user = User(**user.model_dump())
-    new_user.password = get_password_hash(user.password)
+    new_user.password = await password_hasher.hash(user.password)
     session.add(new_user)
     await session.commit()
-    await session.refresh(new_user)
     return new_user
 
 
-@router.get('/', response_model=UserList)
-async def list_users(session: Session, filter: Annotated[FilterPage, Query()]):
-    query = await session.scalars(
-        select(User).offset(filter.skip).limit(filter.limit)
+@router.get('/', response_model=UserList, response_model_exclude_none=True)
+async def list_users(
+    session: Session,
+    filter: Annotated[FilterUser, Query()],
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+):
+    keys, descending = sort_keys(filter, SORT_COLUMNS, User.id)
+    meta = {}
+    if filter.meta:
+        meta['total'] = await user_total(session)
+
+    if if_none_match:
+        versions = await paginate(
+            session,
+            select(*distinct_columns(*ETAG_COLUMNS, *keys)),
+            filter,
+            keys,
+            descending,
+        )
+        etag = page_etag(versions, ETAG_COLUMNS, meta)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, CACHE_CONTROL)
+
+    page = await paginate(
+        session,
+        select(*distinct_columns(*LIST_COLUMNS, *keys)),
+        filter,
+        keys,
+        descending,
     )
-    users = query.all()
-    return {'users': users}
+    headers = {
+        'ETag': page_etag(page, ETAG_COLUMNS, meta),
+        'Cache-Control': CACHE_CONTROL,
+    }
+    if filter.meta:
+        meta['has_more'] = page.has_more
+    if settings.FAST_SERIALIZATION:
+        content = UserList.model_construct(
+            users=construct(UserPublic, page.items),
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            **meta,
+        )
+        return json_response(content, headers, exclude_none=True)
+
+    response.headers.update(headers)
+    return {
+        'users': page.items,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        **meta,
+    }
 
 
 @router.get('/{user_id}', response_model=UserPublic)
-async def get_user(user_id: int, session: Session):
-    user = await session.scalar(select(User).where(User.id == user_id))
+async def get_user(
+    user_id: int,
+    session: Session,
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+):
+    if if_none_match:
+        version = (
+            await session.execute(
+                select(*ETAG_COLUMNS).where(User.id == user_id)
+            )
+        ).first()
+        if version:
+            etag = rows_etag([version], ETAG_COLUMNS)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, CACHE_CONTROL)
+
+    user = (
+        await session.execute(select(*LIST_COLUMNS).where(User.id == user_id))
+    ).first()
     if not user:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found'
         )
+    response.headers['ETag'] = rows_etag([user], ETAG_COLUMNS)
+    response.headers['Cache-Control'] = CACHE_CONTROL
     return user
 
 
@@ -63,18 +164,26 @@ async def update_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
+    password = await password_hasher.hash(user.password)
     try:
-        current_user.username = user.username
-        current_user.email = user.email
-        current_user.password = get_password_hash(user.password)
+        db_user = await session.scalar(
+            update(User)
+            .where(User.id == current_user.id)
+            .values({
+                **user.model_dump(),
+                'password': password,
+                'version': User.version + 1,
+            })
+            .returning(User)
+        )
         await session.commit()
-        await session.refresh(current_user)
     except IntegrityError:
         error_message = 'username or email already exists'
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail=error_message
         )
-    return current_user
+    principal_cache.invalidate(current_user.email)
+    return db_user
 
 
 @router.delete('/{user_id}', status_code=HTTPStatus.NO_CONTENT)
@@ -85,5 +194,13 @@ async def delete_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
-    await session.delete(current_user)
+    await session.execute(delete(Todo).where(Todo.user_id == current_user.id))
+    await session.execute(
+        delete(TodoCount).where(TodoCount.user_id == current_user.id)
+    )
+    await session.execute(
+        delete(ChangeSequence).where(ChangeSequence.user_id == current_user.id)
+    )
+    await session.execute(delete(User).where(User.id == current_user.id))
     await session.commit()
+    principal_cache.invalidate(current_user.email)
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 
 from fast_zero.models import TodoState
 
@@ -22,6 +25,10 @@ class UserPublic(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    has_more: bool | None = None
+    total: int | None = None
 
 
 class Token(BaseModel):
@@ -39,8 +46,50 @@ class TodoPublic(TodoSchema):
     id: int
 
 
+class TodoChange(TodoPublic):
+    version: int
+    create_at: datetime
+    updated_at: datetime
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoChange]
+    next_token: str | None = None
+    has_more: bool = False
+
+
+class TodoEvent(BaseModel):
+    todos: list[TodoChange]
+
+
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    has_more: bool | None = None
+    total: int | None = None
+    counts: dict[TodoState, int] | None = None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class TodoBulkResult(BaseModel):
+    todos: list[TodoPublic]
+    errors: list[BulkItemError]
+
+
+class ImportRowError(BaseModel):
+    line: int
+    errors: list[dict[str, Any]]
+
+
+class TodoImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportRowError]
 
 
 class TodoUpdate(BaseModel):
@@ -55,12 +104,69 @@ class FilterPage(BaseModel):
         default=10, ge=1, description='Maximum number of items to return'
     )
     sort: str | None = Field(default=None, description='Field to sort by')
-    order: str | None = Field(
+    order: Literal['asc', 'desc'] | None = Field(
         default=None, description='Order of sorting (asc/desc)'
     )
+    cursor: str | None = Field(
+        default=None,
+        description='Opaque cursor from a previous page; overrides skip',
+    )
+    meta: bool = Field(
+        default=False, description='Include has_more and item totals'
+    )
+
 
+class FilterUser(FilterPage):
+    sort: (
+        Literal['id', 'username', 'email', 'create_at', 'updated_at'] | None
+    ) = Field(default=None, description='Field to sort by')
 
-class FilterTodo(FilterPage):
+
+class TodoFilter(BaseModel):
     title: str | None = Field(None, min_length=3, max_length=20)
     description: str | None = Field(None, min_length=3, max_length=20)
     state: TodoState | None = None
+
+
+class FilterTodo(FilterPage, TodoFilter):
+    sort: Literal['id', 'title', 'state', 'create_at', 'updated_at'] | None = (
+        Field(default=None, description='Field to sort by')
+    )
+
+
+class FilterChanges(BaseModel):
+    since: str | None = Field(
+        default=None,
+        description='Sync token from a previous call; omit for a full sync',
+    )
+    limit: int = Field(
+        default=100, ge=1, description='Maximum number of changes to return'
+    )
+
+
+class TodoBulkUpdate(BaseModel):
+    ids: list[int] | None = None
+    filter: TodoFilter | None = None
+    changes: TodoUpdate
+
+    @model_validator(mode='after')
+    def check_selection(self):
+        if self.ids is None and self.filter is None:
+            raise ValueError('Either ids or filter must be given')
+        if self.filter is not None and not self.filter.model_dump(
+            exclude_none=True
+        ):
+            raise ValueError('Filter must have at least one criterion')
+        changes = self.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise ValueError('No changes given')
+        # as colunas de `todos` não aceitam nulo
+        nulls = [field for field, value in changes.items() if value is None]
+        if nulls:
+            raise ValueError(f'Changes cannot be null: {", ".join(nulls)}')
+        return self
+
+
+class TodoBulkUpdateResult(BaseModel):
+    updated: int
+    ids: list[int]
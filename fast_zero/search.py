@@ -0,0 +1,94 @@
+from functools import reduce
+from operator import add
+
+from sqlalchemy import (
+    ColumnElement,
+    Subquery,
+    and_,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+)
+
+from fast_zero.models import Todo
+
+todos_fts = table('todos_fts')
+fts_rowid = literal_column('todos_fts.rowid')
+fts_rank = literal_column('todos_fts.rank')
+
+
+def _fts5_phrase(column: str, term: str) -> str:
+    return '{}:"{}"'.format(column, term.replace('"', '""'))
+
+
+def _sqlite_search(terms: dict[str, str]) -> Subquery:
+    match = ' AND '.join(
+        _fts5_phrase(column, term) for column, term in terms.items()
+    )
+    return (
+        select(fts_rowid.label('id'), fts_rank.label('rank'))
+        .select_from(todos_fts)
+        .where(text('todos_fts MATCH :match').bindparams(match=match))
+        .subquery('todo_search')
+    )
+
+
+def _postgresql_search(terms: dict[str, str]) -> Subquery:
+    # 'simple' deve ser literal para casar com os índices de expressão
+    config = literal_column("'simple'")
+    conditions, ranks = [], []
+    for column, term in terms.items():
+        vector = func.to_tsvector(config, getattr(Todo, column))
+        query = func.plainto_tsquery(config, term)
+        conditions.append(vector.op('@@')(query))
+        ranks.append(func.ts_rank(vector, query))
+    return (
+        select(Todo.id, (-reduce(add, ranks)).label('rank'))
+        .where(and_(*conditions))
+        .subquery('todo_search')
+    )
+
+
+def _fallback_search(terms: dict[str, str]) -> Subquery:
+    conditions: list[ColumnElement] = [
+        getattr(Todo, column).contains(term) for column, term in terms.items()
+    ]
+    return (
+        select(Todo.id, literal(0).label('rank'))
+        .where(and_(*conditions))
+        .subquery('todo_search')
+    )
+
+
+def todo_search(
+    dialect: str, title: str | None = None, description: str | None = None
+) -> Subquery | None:
+    """Monta a busca textual por título e/ou descrição dos todos
+
+    No SQLite consulta a tabela FTS5 `todos_fts`; no PostgreSQL usa os
+    índices GIN sobre `to_tsvector`. Outros bancos recaem em `LIKE`.
+
+    Args:
+        dialect (str): nome do dialeto do banco de dados
+        title (str | None): termo buscado no título
+        description (str | None): termo buscado na descrição
+
+    Returns:
+        Subquery | None: subconsulta com as colunas `id` e `rank` (menor é
+            mais relevante), ou None se não houver termos
+    """
+    terms = {
+        column: term
+        for column, term in (('title', title), ('description', description))
+        if term
+    }
+    if not terms:
+        return None
+    if dialect == 'sqlite':
+        return _sqlite_search(terms)
+    if dialect == 'postgresql':
+        return _postgresql_search(terms)
+    return _fallback_search(terms)
@@ -1,4 +1,6 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from hashlib import sha256
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
@@ -9,6 +11,7 @@ from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import TTLCache
 from fast_zero.database import get_session
 from fast_zero.models import User
 from fast_zero.settings import Settings
@@ -18,6 +21,20 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl='auth/token', refreshUrl='auth/refresh_token'
 )
 settings = Settings()
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Identidade mínima do usuário autenticado, sem relacionamentos."""
+
+    id: int
+    email: str
 
 
 def create_token(data: dict) -> str:
@@ -36,6 +53,33 @@ def create_token(data: dict) -> str:
     return encode(data, settings.SECRET_KEY_JWT, algorithm=settings.ALGORITHM)
 
 
+def decode_token(token: str) -> dict:
+    """Valida e decodifica um token JWT
+
+    Tokens já verificados ficam em `token_cache`, indexados pelo digest do
+    token, até o `exp` do próprio token; requisições repetidas com o mesmo
+    token não refazem a verificação da assinatura.
+
+    Args:
+        token (str): token JWT
+
+    Raises:
+        DecodeError: token inválido
+        ExpiredSignatureError: token expirado
+
+    Returns:
+        dict: claims do token
+    """
+    digest = sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = decode(
+            token, settings.SECRET_KEY_JWT, algorithms=[settings.ALGORITHM]
+        )
+        token_cache.set(digest, payload, expires_at=payload.get('exp'))
+    return payload
+
+
 def get_password_hash(password: str) -> str:
     """Converte uma senha em hash
 
@@ -64,14 +108,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session)
-) -> User:
+) -> Principal:
     """Obtém o usuário atual a partir do token JWT
 
+    Carrega apenas `id` e `email`; endpoints que precisam da entidade
+    completa ou de seus relacionamentos devem carregá-la explicitamente.
+    O resultado fica em `principal_cache` até o menor entre o TTL do cache
+    e a expiração do token, evitando a consulta ao banco de dados.
+
     Args:
         token (str): token JWT
 
     Returns:
-        User: usuário
+        Principal: identidade do usuário
     """
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
@@ -79,9 +128,7 @@ async def get_current_user(
         headers={'WWW-Authenticate': 'Bearer'},
     )
     try:
-        payload = decode(
-            token, settings.SECRET_KEY_JWT, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         email = payload.get('sub')
         if not email:
             raise credentials_exception
@@ -90,8 +137,17 @@ async def get_current_user(
     except ExpiredSignatureError:
         raise credentials_exception
 
-    user = await session.scalar(select(User).where(User.email == email))
-    if not user:
+    principal = principal_cache.get(email)
+    if principal:
+        return principal
+
+    result = await session.execute(
+        select(User.id, User.email).where(User.email == email)
+    )
+    row = result.first()
+    if not row:
         raise credentials_exception
 
-    return user
+    principal = Principal(id=row.id, email=row.email)
+    principal_cache.set(email, principal, expires_at=payload.get('exp'))
+    return principal
@@ -0,0 +1,78 @@
+from typing import Any, Iterable, Mapping, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+Schema = TypeVar('Schema', bound=BaseModel)
+
+
+def schema_columns(
+    schema: type[BaseModel], model: type
+) -> list[InstrumentedAttribute]:
+    """Colunas do modelo que correspondem aos campos de um schema
+
+    Args:
+        schema (type[BaseModel]): schema da resposta
+        model (type): modelo mapeado
+
+    Returns:
+        list[InstrumentedAttribute]: colunas a selecionar
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def distinct_columns(
+    *columns: InstrumentedAttribute,
+) -> list[InstrumentedAttribute]:
+    """Remove colunas repetidas mantendo a ordem
+
+    Args:
+        *columns (InstrumentedAttribute): colunas, possivelmente repetidas
+
+    Returns:
+        list[InstrumentedAttribute]: colunas únicas
+    """
+    return list({column.key: column for column in columns}.values())
+
+
+def construct(schema: type[Schema], rows: Iterable[Any]) -> list[Schema]:
+    """Monta instâncias de um schema a partir de linhas, sem validá-las
+
+    Só deve receber dados lidos do nosso próprio banco, que já respeitam os
+    tipos do schema. Aceita objetos mapeados ou linhas de uma consulta.
+
+    Args:
+        schema (type[Schema]): schema de cada item
+        rows (Iterable[Any]): linhas com os campos do schema
+
+    Returns:
+        list[Schema]: itens prontos para serializar
+    """
+    fields = schema.model_fields
+    return [
+        schema.model_construct(**{name: getattr(row, name) for name in fields})
+        for row in rows
+    ]
+
+
+def json_response(
+    content: BaseModel,
+    headers: Mapping[str, str] | None = None,
+    exclude_none: bool = False,
+) -> Response:
+    """Serializa um schema direto para JSON, sem passar pelo `response_model`
+
+    Args:
+        content (BaseModel): corpo da resposta
+        headers (Mapping[str, str] | None): cabeçalhos da resposta
+        exclude_none (bool): omite campos `None`
+
+    Returns:
+        Response: resposta JSON
+    """
+    return Response(
+        content=content.model_dump_json(exclude_none=exclude_none),
+        media_type='application/json',
+        headers=headers,
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,3 +12,38 @@ class Settings(BaseSettings):
     ALGORITHM: str
     EXPIRE_MINUTES: int
     SECRET_KEY_JWT: str
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PRINCIPAL_CACHE_TTL: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    TOKEN_CACHE_TTL: int = 300
+    TOKEN_CACHE_SIZE: int = 10_000
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 128
+    SQLITE_JOURNAL_MODE: Literal[
+        'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'
+    ] = 'WAL'
+    SQLITE_SYNCHRONOUS: Literal['OFF', 'NORMAL', 'FULL', 'EXTRA'] = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    TODO_BULK_MAX_ITEMS: int = 1000
+    EXPORT_CHUNK_SIZE: int = 1000
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_ERRORS: int = 1000
+    IMPORT_MAX_RECORD_LENGTH: int = 65_536
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    FAST_SERIALIZATION: bool = False
+    DEBUG: bool = False
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01
+    PROFILING_SLOW_REQUEST_MS: float = 500.0
+    PROFILING_SLOW_QUERY_MS: float = 100.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_DIR: str = 'profiles'
+    PROFILING_MAX_FILES: int = 200
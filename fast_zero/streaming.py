@@ -0,0 +1,222 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Mapping, Sequence
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def encode_ndjson(rows: Sequence[Mapping], header: bool = False) -> str:
+    return ''.join(json.dumps(dict(row), default=str) + '\n' for row in rows)
+
+
+def encode_csv(rows: Sequence[Mapping], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header and rows:
+        writer.writerow(rows[0].keys())
+    writer.writerows(row.values() for row in rows)
+    return buffer.getvalue()
+
+
+ENCODERS = {'ndjson': encode_ndjson, 'csv': encode_csv}
+
+
+async def stream_rows(
+    engine: AsyncEngine, query: Select, format: str, chunk_size: int
+) -> AsyncIterator[str]:
+    """Transmite o resultado de uma consulta em blocos de NDJSON ou CSV
+
+    A consulta é lida com um cursor do lado do servidor, `chunk_size`
+    linhas por vez, então a memória usada não depende do total de linhas.
+    A sessão é aberta aqui porque as dependências com `yield` do FastAPI
+    são encerradas antes do corpo da resposta ser enviado.
+
+    Args:
+        engine (AsyncEngine): engine do banco de dados
+        query (Select): consulta de colunas a exportar
+        format (str): `ndjson` ou `csv`
+        chunk_size (int): linhas por bloco
+
+    Yields:
+        str: bloco codificado
+    """
+    encode = ENCODERS[format]
+    async with AsyncSession(engine) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=chunk_size)
+        )
+        header = True
+        async for partition in result.mappings().partitions():
+            yield encode(partition, header=header)
+            header = False
+            await asyncio.sleep(0)
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int
+) -> AsyncIterator[str | ValueError]:
+    """Quebra um corpo recebido em blocos de bytes em linhas de texto UTF-8
+
+    Uma linha com mais de `max_length` caracteres vira um `ValueError`, e o
+    resto dela é descartado à medida que chega, sem acumular na memória.
+
+    Args:
+        chunks (AsyncIterator[bytes]): blocos do corpo da requisição
+        max_length (int): tamanho máximo de uma linha
+
+    Yields:
+        str | ValueError: linha sem o terminador, ou o erro da linha longa
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending, skipping = '', False
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            if skipping:
+                # fim de uma linha longa demais, já informada
+                skipping = False
+            elif len(line) > max_length:
+                yield ValueError('Line too long')
+            else:
+                yield line.removesuffix('\r')
+        if not skipping and len(pending) > max_length:
+            yield ValueError('Line too long')
+            skipping = True
+        if skipping:
+            pending = ''
+    pending += decoder.decode(b'', final=True)
+    if skipping or not pending:
+        return
+    if len(pending) > max_length:
+        yield ValueError('Line too long')
+    else:
+        yield pending.removesuffix('\r')
+
+
+async def _parse_ndjson(
+    lines: AsyncIterator[str | ValueError], max_length: int
+) -> AsyncIterator[tuple[int, dict | ValueError]]:
+    number = 0
+    async for line in lines:
+        number += 1
+        if isinstance(line, ValueError):
+            yield number, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield number, error
+            continue
+        if not isinstance(record, dict):
+            yield number, ValueError('Expected a JSON object')
+            continue
+        yield number, record
+
+
+def _ends_in_quoted_field(line: str, quoted: bool) -> bool:
+    """Diz se a linha termina dentro de um campo CSV entre aspas
+
+    Segue o dialeto padrão do módulo `csv`: só é entre aspas o campo que
+    começa com `"`, e `""` dentro dele é uma aspa literal. Aspas no meio de
+    um campo sem aspas, como em `tela 5"`, são texto.
+
+    Args:
+        line (str): linha do registro
+        quoted (bool): se a linha começa dentro de um campo entre aspas
+
+    Returns:
+        bool: se o campo entre aspas continua na próxima linha
+    """
+    start, closing = not quoted, False
+    for char in line:
+        if quoted:
+            if char == '"':
+                quoted, closing = False, True
+        elif closing and char == '"':
+            # `""`: aspa literal, o campo continua entre aspas
+            quoted, closing = True, False
+        elif char == ',':
+            start, closing = True, False
+        else:
+            quoted = start and char == '"'
+            start, closing = False, False
+    return quoted
+
+
+async def _parse_csv(
+    lines: AsyncIterator[str | ValueError], max_length: int
+) -> AsyncIterator[tuple[int, dict | ValueError]]:
+    header = None
+    number, start, pending, size = 0, 0, [], 0
+    quoted = skipping = False
+    async for line in lines:
+        number += 1
+        if isinstance(line, ValueError):
+            # a linha longa encerra o registro em que estava
+            yield (start if pending or skipping else number), line
+            pending, size, quoted, skipping = [], 0, False, False
+            continue
+        if not (pending or skipping):
+            start = number
+        quoted = _ends_in_quoted_field(line, quoted)
+        if skipping:
+            # registro longo demais: descarta até o campo entre aspas fechar
+            skipping = quoted
+            continue
+        pending.append(line)
+        size += len(line) + 1
+        if quoted and size > max_length:
+            yield start, ValueError('Record too long')
+            pending, size, skipping = [], 0, True
+            continue
+        if quoted:
+            continue
+        record = '\n'.join(pending)
+        pending, size = [], 0
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = values
+        elif len(values) != len(header):
+            yield start, ValueError('Wrong number of columns')
+        else:
+            yield start, dict(zip(header, values))
+
+    if pending or skipping:
+        yield start, ValueError('Unterminated quoted field')
+
+
+PARSERS = {'ndjson': _parse_ndjson, 'csv': _parse_csv}
+
+
+def parse_records(
+    chunks: AsyncIterator[bytes], format: str, max_length: int
+) -> AsyncIterator[tuple[int, dict | ValueError]]:
+    """Lê registros de um corpo NDJSON ou CSV à medida que ele chega
+
+    No CSV a primeira linha é o cabeçalho. Linhas malformadas não
+    interrompem a leitura: são produzidas como `ValueError`. Linhas e
+    registros CSV com mais de `max_length` caracteres também viram erro,
+    então um registro ruim não traz o resto do corpo para a memória.
+
+    Args:
+        chunks (AsyncIterator[bytes]): blocos do corpo da requisição
+        format (str): `ndjson` ou `csv`
+        max_length (int): tamanho máximo de uma linha ou registro
+
+    Returns:
+        AsyncIterator[tuple[int, dict | ValueError]]: número da linha e
+            registro ou erro
+    """
+    return PARSERS[format](iter_lines(chunks, max_length), max_length)
@@ -32,6 +32,15 @@ target_metadata = table_registry.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Ignore objects created by the search DDL in fast_zero.models."""
+    if type_ == 'table' and name.startswith('todos_fts'):
+        return False
+    if type_ == 'index' and name.endswith('_search'):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -48,6 +57,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -57,7 +67,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,54 @@
+"""add todo search
+
+Revision ID: 9a3d6e2b7c15
+Revises: c4e8a1d7f302
+Create Date: 2026-10-18 11:48:52.330871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3d6e2b7c15'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1d7f302'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE todos_fts USING fts5(title, description, content='todos', content_rowid='id', tokenize='trigram')",
+    'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+POSTGRESQL_SEARCH_DDL = [
+    "CREATE INDEX ix_todos_title_search ON todos USING gin (to_tsvector('simple', title))",
+    "CREATE INDEX ix_todos_description_search ON todos USING gin (to_tsvector('simple', description))",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_insert')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
+    elif dialect == 'postgresql':
+        op.drop_index('ix_todos_description_search', table_name='todos')
+        op.drop_index('ix_todos_title_search', table_name='todos')
@@ -0,0 +1,72 @@
+"""store timestamps with microseconds
+
+Revision ID: a4f7c2e9b318
+Revises: f3a8c6d2e917
+Create Date: 2026-10-18 18:32:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f7c2e9b318'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c6d2e917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# no PostgreSQL o default continua `now()`; só o SQLite muda de formato
+SQLITE_NOW = "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+SQLITE_CURRENT_TIMESTAMP = '(CURRENT_TIMESTAMP)'
+TIMESTAMP_COLUMNS = {
+    'users': ('create_at', 'updated_at'),
+    'todos': ('create_at', 'updated_at'),
+}
+# recriar `todos` no SQLite descarta os triggers da busca e dos contadores
+SQLITE_TODO_TRIGGERS = [
+    'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    'CREATE TRIGGER todo_counts_insert AFTER INSERT ON todos BEGIN INSERT INTO todo_counts (user_id, state, count) VALUES (new.user_id, new.state, 1) ON CONFLICT (user_id, state) DO UPDATE SET count = todo_counts.count + 1; END',
+    'CREATE TRIGGER todo_counts_delete AFTER DELETE ON todos BEGIN UPDATE todo_counts SET count = count - 1 WHERE user_id = old.user_id AND state = old.state; END',
+    'CREATE TRIGGER todo_counts_update AFTER UPDATE OF state, user_id ON todos BEGIN UPDATE todo_counts SET count = count - 1 WHERE user_id = old.user_id AND state = old.state; INSERT INTO todo_counts (user_id, state, count) VALUES (new.user_id, new.state, 1) ON CONFLICT (user_id, state) DO UPDATE SET count = todo_counts.count + 1; END',
+]
+
+
+def _set_sqlite_defaults(default: str) -> None:
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=False,
+                    server_default=sa.text(default),
+                )
+    for statement in SQLITE_TODO_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # datas gravadas pelo CURRENT_TIMESTAMP, sem fração de segundo, passam
+    # ao formato `.ffffff` das datas gravadas pelo SQLAlchemy
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f"UPDATE {table} SET {column} = "
+                f"strftime('%Y-%m-%d %H:%M:%f000', {column}) "
+                f"WHERE length({column}) = 19"
+            )
+    _set_sqlite_defaults(SQLITE_NOW)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _set_sqlite_defaults(SQLITE_CURRENT_TIMESTAMP)
@@ -0,0 +1,52 @@
+"""add todo timestamps
+
+Revision ID: e1c9a5f3b804
+Revises: d7b2f4e81a60
+Create Date: 2026-10-18 15:07:12.604419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1c9a5f3b804'
+down_revision: Union[str, Sequence[str], None] = 'd7b2f4e81a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# recriar a tabela no SQLite descarta os triggers da busca textual
+SQLITE_SEARCH_TRIGGERS = [
+    'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = [
+        sa.Column('create_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    ]
+    if op.get_bind().dialect.name == 'sqlite':
+        # o SQLite não aceita ADD COLUMN com default não constante em uma
+        # tabela com linhas, então a tabela é recriada
+        with op.batch_alter_table('todos', recreate='always') as batch_op:
+            for column in columns:
+                batch_op.add_column(column)
+        for statement in SQLITE_SEARCH_TRIGGERS:
+            op.execute(statement)
+    else:
+        for column in columns:
+            op.add_column('todos', column)
+    op.create_index('ix_todos_user_id_updated_at_id', 'todos', ['user_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_user_id_updated_at_id', table_name='todos')
+    op.drop_column('todos', 'updated_at')
+    op.drop_column('todos', 'create_at')
@@ -1,24 +1,35 @@
+import os
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from zoneinfo import ZoneInfo
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import event
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
+from fast_zero import security
 from fast_zero.app import app
 from fast_zero.database import get_session
 from fast_zero.models import table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.query_stats import instrument_engine
+from fast_zero.security import (
+    get_password_hash,
+    principal_cache,
+    token_cache,
+)
 from fast_zero.settings import Settings
 
 from .factories import UserFactory
 
 TZ_INFO = ZoneInfo('America/Sao_Paulo')
 PASSWORD = Settings().FAKE_PASSWORD
+SAVEPOINT_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO')
 
 
 async def create_user(session) -> UserFactory:
@@ -38,6 +49,35 @@ async def create_user(session) -> UserFactory:
     return user
 
 
+@pytest.fixture(autouse=True, scope='session')
+def cheap_password_hash():
+    """Troca os parâmetros do Argon2 por outros baratos durante os testes.
+
+    Os hashes continuam sendo Argon2 válidos, só que custam frações de
+    milissegundo em vez de dezenas; o custo real não é o que se testa aqui.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            security,
+            'pwd_context',
+            PasswordHash((
+                Argon2Hasher(time_cost=1, memory_cost=1024, parallelism=1),
+            )),
+        )
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Limpa os caches em memória para que um teste não enxergue dados
+    armazenados por outro."""
+    principal_cache.clear()
+    token_cache.clear()
+    yield
+    principal_cache.clear()
+    token_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def client(session):
     """Cria um cliente de teste que utiliza uma sessão do banco de dados
@@ -74,29 +114,76 @@ async def client(session):
     app.dependency_overrides.clear()
 
 
+def _use_savepoints(engine):
+    """Faz o driver do SQLite deixar o controle de transações para o
+    SQLAlchemy, necessário para o `SAVEPOINT` funcionar.
+
+    Args:
+        engine (AsyncEngine): Engine do SQLite.
+    """
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, 'begin')
+    def do_begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    """Cria o schema uma única vez por processo de testes.
+
+    O banco fica em memória, compartilhado entre as conexões do processo e
+    vivo enquanto a conexão deste fixture estiver aberta. Com o
+    pytest-xdist cada worker usa um banco com o próprio nome, então os
+    processos não compartilham dados.
+
+    Yields:
+        str: URL assíncrona do banco de testes.
+    """
+    worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    url = f'sqlite:///file:fast_zero_{worker}?mode=memory&cache=shared&uri=true'
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        table_registry.metadata.create_all(connection)
+        connection.commit()
+        yield url.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    engine.dispose()
+
+
 @pytest_asyncio.fixture
-async def session():
-    """Cria uma sessão de banco de dados para testes utilizando um banco
-    de dados SQLite em memória. A sessão é criada com um pool estático para
-    evitar problemas de concorrência em testes que podem ser executados em
-    paralelo. Após os testes, a tabela é removida do banco de dados.
+async def session(database_url):
+    """Cria uma sessão de banco de dados isolada para cada teste.
+
+    O teste roda dentro de uma transação que é desfeita ao final, e os
+    `commit` e `rollback` da sessão atuam sobre um `SAVEPOINT` dentro dela.
+    Assim o schema é criado uma só vez e nenhum dado passa de um teste para
+    outro.
 
     Yields:
         Session: Sessão do banco de dados para testes.
     """
     engine = create_async_engine(
-        'sqlite+aiosqlite:///:memory:',
+        database_url,
         connect_args={'check_same_thread': False},
-        poolclass=StaticPool
+        poolclass=StaticPool,
     )
-    async with engine.begin() as conn:
-        await conn.run_sync(table_registry.metadata.create_all)
+    _use_savepoints(engine)
+    instrument_engine(engine)
 
-    async with AsyncSession(engine, expire_on_commit=False) as session:
-        yield session
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            connection,
+            expire_on_commit=False,
+            join_transaction_mode='create_savepoint',
+        ) as session:
+            yield session
+        await transaction.rollback()
 
-    async with engine.begin() as conn:
-        await conn.run_sync(table_registry.metadata.drop_all)
+    await engine.dispose()
 
 
 @pytest_asyncio.fixture
@@ -160,8 +247,10 @@ def _mock_db_time(*, model, time=datetime.now(TZ_INFO).replace(tzinfo=None)):
             target.updated_at = time
 
     event.listen(model, 'before_insert', fake_time_hook)
-    yield time
-    event.remove(model, 'before_insert', fake_time_hook)
+    try:
+        yield time
+    finally:
+        event.remove(model, 'before_insert', fake_time_hook)
 
 
 @pytest.fixture
@@ -174,6 +263,76 @@ def mock_db_time():
     return _mock_db_time
 
 
+@contextmanager
+def _count_queries(engine):
+    """Registra os comandos SQL enviados ao banco de dados dentro do bloco.
+
+    Args:
+        engine (AsyncEngine): Engine monitorada.
+
+    Yields:
+        list[str]: Comandos executados, na ordem de envio.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        # savepoints vêm do isolamento entre testes, não da aplicação
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute',
+                 before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+
+@contextmanager
+def _assert_max_queries(engine, maximum):
+    """Falha se o bloco enviar mais de `maximum` comandos SQL.
+
+    Args:
+        engine (AsyncEngine): Engine monitorada.
+        maximum (int): Quantidade máxima de comandos.
+
+    Yields:
+        list[str]: Comandos executados, na ordem de envio.
+    """
+    with _count_queries(engine) as statements:
+        yield statements
+    assert len(statements) <= maximum, (
+        f'{len(statements)} queries (max {maximum}):\n'
+        + '\n'.join(statements)
+    )
+
+
+@pytest.fixture
+def assert_max_queries(session):
+    """Limita a quantidade de comandos SQL de um bloco.
+
+    Exemplo de uso:
+        ```with assert_max_queries(2):
+            client.get('/todos/', headers=headers)
+        ```
+
+    Returns:
+        Callable: Context manager que recebe o máximo de comandos
+    """
+    return partial(_assert_max_queries, session.bind)
+
+
+@pytest.fixture
+def count_queries(session):
+    """Conta os comandos SQL executados pela sessão de testes.
+
+    Returns:
+        Callable: Context manager que produz a lista de comandos executados
+    """
+    return partial(_count_queries, session.bind)
+
+
 @pytest.fixture
 def token(client, user):
     """Gera um token de autenticação para o usuário fornecido.
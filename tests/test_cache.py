@@ -0,0 +1,50 @@
+from freezegun import freeze_time
+
+from fast_zero.cache import TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3  # noqa: PLR2004
+
+
+def test_cache_entry_expires_after_ttl():
+    with freeze_time('2026-01-01 12:00:00') as frozen:
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        frozen.tick(61)
+
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+
+def test_cache_entry_respects_expires_at():
+    with freeze_time('2026-01-01 12:00:00') as frozen:
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1, expires_at=frozen().timestamp() + 10)
+        frozen.tick(11)
+
+        assert cache.get('a') is None
+
+
+def test_cache_disabled_with_zero_ttl():
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set('a', 1)
+
+    assert cache.get('a') is None
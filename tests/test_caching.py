@@ -0,0 +1,26 @@
+import pytest
+
+from fast_zero.caching import etag_matches, make_etag
+
+
+def test_make_etag_is_quoted_and_stable():
+    etag = make_etag(1, 2)
+    assert etag.startswith('"')
+    assert etag.endswith('"')
+    assert etag == make_etag(1, 2)
+    assert etag != make_etag(12)
+
+
+@pytest.mark.parametrize(
+    ('header', 'expected'),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ('*', True),
+        ('"abcd"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
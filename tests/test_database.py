@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_zero.database import (
+    InstrumentedQueuePool,
+    engine_options,
+    pool_stats,
+    set_sqlite_pragmas,
+)
+from fast_zero.settings import Settings
+
+
+def test_engine_options_for_memory_sqlite():
+    settings = Settings(DATABASE_URL='sqlite+aiosqlite:///:memory:')
+    options = engine_options(settings)
+
+    assert 'poolclass' not in options
+    assert options['connect_args'] == {
+        'cached_statements': settings.DB_STATEMENT_CACHE_SIZE
+    }
+
+
+def test_engine_options_for_postgresql():
+    settings = Settings(
+        DATABASE_URL='postgresql+asyncpg://app@localhost/app',
+        DB_POOL_SIZE=20,
+        DB_MAX_OVERFLOW=5,
+    )
+    options = engine_options(settings)
+
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_size'] == 20  # noqa: PLR2004
+    assert options['max_overflow'] == 5  # noqa: PLR2004
+    assert options['connect_args'] == {
+        'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE
+    }
+
+
+@pytest.mark.asyncio
+async def test_sqlite_file_engine_applies_pragmas_and_metrics(tmp_path):
+    settings = Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path / "test.db"}',
+        DB_POOL_SIZE=2,
+        DB_MAX_OVERFLOW=0,
+    )
+    engine = create_async_engine(
+        settings.DATABASE_URL, **engine_options(settings)
+    )
+    set_sqlite_pragmas(engine, settings)
+
+    async with engine.connect() as conn:
+        journal_mode = await conn.scalar(text('PRAGMA journal_mode'))
+        synchronous = await conn.scalar(text('PRAGMA synchronous'))
+        stats = pool_stats(engine)
+    await engine.dispose()
+
+    assert journal_mode == 'wal'
+    assert synchronous == 1  # NORMAL
+    assert stats['checked_out'] == 1
+    assert stats['capacity'] == 2  # noqa: PLR2004
+    assert stats['saturation'] == 0.5  # noqa: PLR2004
+    assert stats['checkout_wait']['count'] >= 1
@@ -2,6 +2,7 @@ from dataclasses import asdict
 
 import pytest
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 from fast_zero.models import Todo, User
 
@@ -16,7 +17,9 @@ async def test_create_user(session, mock_db_time):
         await session.commit()
 
         user = await session.scalar(
-            select(User).where(User.username == 'Jhon')
+            select(User)
+            .where(User.username == 'Jhon')
+            .options(selectinload(User.todos))
         )
 
         assert asdict(user) == {
@@ -27,19 +30,21 @@ async def test_create_user(session, mock_db_time):
             'todos': [],
             'create_at': time,
             'updated_at': time,
+            'version': 1,
         }
 
 
 @pytest.mark.asyncio
-async def test_create_todo(session, user):
-    todo = Todo(
-        title='Test Todo',
-        description='This is a test todo',
-        state='draft',
-        user_id=user.id,
-    )
-    session.add(todo)
-    await session.commit()
+async def test_create_todo(session, user, mock_db_time):
+    with mock_db_time(model=Todo) as time:
+        todo = Todo(
+            title='Test Todo',
+            description='This is a test todo',
+            state='draft',
+            user_id=user.id,
+        )
+        session.add(todo)
+        await session.commit()
     todo = await session.scalar(select(Todo))
 
     assert asdict(todo) == {
@@ -48,6 +53,10 @@ async def test_create_todo(session, user):
         'description': 'This is a test todo',
         'state': 'draft',
         'user_id': user.id,
+        'change_seq': 0,
+        'create_at': time,
+        'updated_at': time,
+        'version': 1,
     }
 
 
@@ -61,6 +70,6 @@ async def test_user_todo_relationship(session, user):
     )
     session.add(todo)
     await session.commit()
-    await session.refresh(user)
+    await session.refresh(user, ['todos'])
 
     assert user.todos == [todo]
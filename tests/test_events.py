@@ -0,0 +1,93 @@
+import pytest
+
+from fast_zero.app import app
+from fast_zero.events import RESYNC, InMemoryBroker, get_broker, sse_stream
+
+
+@pytest.fixture
+def broker():
+    broker = InMemoryBroker(queue_size=2)
+    app.dependency_overrides[get_broker] = lambda: broker
+    yield broker
+    app.dependency_overrides.pop(get_broker)
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_only_to_channel():
+    broker = InMemoryBroker(queue_size=10)
+    async with broker.subscribe(1) as mine, broker.subscribe(2) as other:
+        await broker.publish(1, 'todos.created', '{}')
+
+        assert await mine.get() == ('todos.created', '{}')
+        assert other.queue.empty()
+
+    assert not broker.has_subscribers(1)
+    assert broker.stats() == {'channels': 0, 'subscribers': 0, 'dropped': 0}
+
+
+@pytest.mark.asyncio
+async def test_full_subscription_drops_events_and_asks_for_resync():
+    broker = InMemoryBroker(queue_size=2)
+    async with broker.subscribe(1) as subscription:
+        for number in range(5):
+            await broker.publish(1, 'todos.updated', str(number))
+
+        assert broker.stats()['dropped'] == 3  # noqa: PLR2004
+        assert await subscription.get() == (RESYNC, '{}')
+
+        await broker.publish(1, 'todos.updated', '5')
+        assert await subscription.get() == ('todos.updated', '5')
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_formats_events_and_heartbeats():
+    broker = InMemoryBroker(queue_size=10)
+    stream = sse_stream(broker, 1, heartbeat=0.01)
+
+    assert await anext(stream) == ': connected\n\n'
+    assert await anext(stream) == ': keepalive\n\n'
+
+    await broker.publish(1, 'todos.created', '{"todos": []}')
+    assert await anext(stream) == (
+        'event: todos.created\ndata: {"todos": []}\n\n'
+    )
+
+    await stream.aclose()
+    assert not broker.has_subscribers(1)
+
+
+@pytest.mark.asyncio
+async def test_todo_writes_are_published(client, user, token, broker):
+    headers = {'Authorization': token}
+    async with broker.subscribe(user.id) as subscription:
+        client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': 'a', 'description': 'b', 'state': 'draft'},
+        )
+        client.patch(
+            '/todos/bulk',
+            headers=headers,
+            json={'ids': [1], 'changes': {'state': 'done'}},
+        )
+
+        created = subscription.queue.get_nowait()
+        updated = subscription.queue.get_nowait()
+
+    assert created[0] == 'todos.created'
+    assert '"title":"a"' in created[1]
+    assert updated[0] == 'todos.updated'
+    assert '"state":"done"' in updated[1]
+    assert '"version":2' in updated[1]
+
+
+def test_todo_events_stream(client, token, broker, monkeypatch):
+    async def stream(*args):
+        # o stream real não termina; o TestClient espera o corpo inteiro
+        yield ': connected\n\n'
+
+    monkeypatch.setattr('fast_zero.routers.todos.sse_stream', stream)
+    response = client.get('/todos/events', headers={'Authorization': token})
+
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert response.text == ': connected\n\n'
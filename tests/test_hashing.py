@@ -0,0 +1,43 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from fast_zero.hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_pool():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    hashed = await hasher.hash('secret')
+
+    assert await hasher.verify('secret', hashed)
+    assert not await hasher.verify('wrong', hashed)
+    assert hasher.hash_latency.count == 1
+    assert hasher.verify_latency.count == 2  # noqa: PLR2004
+    assert hasher.pending == 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    results = await asyncio.gather(
+        hasher.hash('first'), hasher.hash('second'), return_exceptions=True
+    )
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert hasher.rejected == 1
+    hasher.shutdown()
+
+
+def test_login_returns_503_when_hasher_saturated(client, user, monkeypatch):
+    monkeypatch.setattr('fast_zero.hashing.password_hasher.max_pending', 0)
+    response = client.post(
+        'auth/token', data={'username': user.email, 'password': 'secret'}
+    )
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {'detail': 'Server busy, try again later'}
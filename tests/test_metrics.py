@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+from fast_zero.metrics import Histogram, http_metrics
+from fast_zero.prometheus import CONTENT_TYPE
+
+
+def sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line_prefix} not exposed')
+
+
+def test_histogram_exposes_cumulative_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    assert histogram.cumulative() == [('0.1', 2), ('1.0', 3), ('+Inf', 4)]
+    assert histogram.count == 4  # noqa: PLR2004
+    assert histogram.sum == 3.65  # noqa: PLR2004
+
+
+def test_routes_are_registered_before_the_first_request():
+    assert ('GET', '/todos/') in http_metrics.routes
+    assert ('DELETE', '/users/{user_id}') in http_metrics.routes
+
+
+def test_metrics_counts_requests_by_route_template(client, user, token):
+    route = http_metrics.route('GET', '/users/{user_id}')
+    before = route.responses['2xx']
+
+    client.get(f'/users/{user.id}')
+    client.get('/users/999')
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == CONTENT_TYPE
+    labels = 'method="GET",route="/users/{user_id}"'
+    responses = f'fast_zero_http_responses_total{{{labels},status="2xx"}}'
+    duration = f'fast_zero_http_request_duration_seconds_count{{{labels}}}'
+    assert sample(response.text, responses) == before + 1
+    assert sample(response.text, duration) == route.latency.count
+    assert route.responses['4xx'] >= 1
+
+
+def test_metrics_aggregates_unknown_paths_and_methods(client):
+    series = len(http_metrics.routes)
+    before = http_metrics.unmatched.responses['4xx']
+
+    client.get('/does-not-exist')
+    for n in range(5):
+        client.request(f'X{n}', '/users/1')
+        client.request(f'Y{n}', '/nope')
+
+    assert len(http_metrics.routes) == series
+    assert http_metrics.unmatched.responses['4xx'] == before + 11  # noqa: PLR2004
+    http_lines = [
+        line
+        for line in client.get('/metrics').text.splitlines()
+        if line.startswith('fast_zero_http_')
+    ]
+    assert any('route="unmatched"' in line for line in http_lines)
+    assert not any('method="X0"' in line for line in http_lines)
+
+
+def test_metrics_exposes_component_stats(client, user, token):
+    client.get('/todos/', headers={'Authorization': token})
+    client.get('/todos/', headers={'Authorization': token})
+
+    text = client.get('/metrics').text
+
+    assert 0 < sample(text, 'fast_zero_cache_hit_ratio{cache="principal"}')
+    assert sample(text, 'fast_zero_password_hash_pending') == 0
+    assert sample(text, 'fast_zero_events_subscribers') == 0
+    assert (
+        sample(
+            text, 'fast_zero_db_statements_max{method="GET",route="/todos/"}'
+        )
+        >= 1
+    )
+    # só a própria requisição de /metrics está em andamento
+    assert sample(text, 'fast_zero_http_requests_in_flight') == 1
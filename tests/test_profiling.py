@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from fast_zero.app import app
+from fast_zero.models import User
+from fast_zero.profiling import (
+    Profiler,
+    ProfileStore,
+    ProfilingMiddleware,
+    RequestProfile,
+)
+
+
+def make_profiler(tmp_path, **options):
+    defaults = {
+        'sample_rate': 1.0,
+        'slow_request_ms': 0.0,
+        'slow_query_ms': 10_000.0,
+        'interval_ms': 1.0,
+    }
+    return Profiler(ProfileStore(tmp_path, 10), **{**defaults, **options})
+
+
+def reports(tmp_path, kind):
+    return [
+        json.loads(path.read_text())
+        for path in sorted(tmp_path.glob(f'*-{kind}.json'))
+    ]
+
+
+def test_profile_store_keeps_most_recent_files(tmp_path):
+    store = ProfileStore(tmp_path, max_files=3)
+    paths = [store.write('request', {'n': n}) for n in range(5)]
+
+    assert sorted(tmp_path.iterdir()) == paths[2:]
+
+
+@pytest.mark.asyncio
+async def test_request_profile_samples_suspended_task():
+    async def waiting_on_database():
+        await asyncio.sleep(1)
+
+    task = asyncio.create_task(waiting_on_database())
+    await asyncio.sleep(0)
+    profile = RequestProfile(task=task, thread_id=0, sampled=True)
+
+    profile.sample(None)
+    task.cancel()
+
+    assert profile.samples == 1
+    (stack,) = profile.stacks
+    assert 'waiting_on_database' in stack
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_recorded_with_plan(session, user, tmp_path):
+    profiler = make_profiler(tmp_path, slow_query_ms=0.0)
+    profiler.instrument(session.bind)
+
+    await session.scalar(select(User).where(User.email == user.email))
+
+    (report,) = reports(tmp_path, 'query')
+    (query,) = report['queries']
+    assert query['statement'].startswith('SELECT')
+    assert query['parameters'] == [user.email]
+    assert query['slow'] is True
+    assert 'SEARCH users' in str(query['plan'])
+
+
+def test_slow_request_writes_profile(client, session, token, tmp_path):
+    profiler = make_profiler(tmp_path)
+    profiler.instrument(session.bind)
+
+    with TestClient(ProfilingMiddleware(app, profiler)) as profiled:
+        response = profiled.get('/todos/', headers={'Authorization': token})
+    profiler.shutdown()
+
+    (report,) = reports(tmp_path, 'request')
+    assert report['route'] == '/todos/'
+    assert report['status'] == response.status_code
+    assert report['profile']['samples'] == sum(
+        report['profile']['stacks'].values()
+    )
+    assert report['queries']
+    assert all(query['plan'] is None for query in report['queries'])
+
+
+def test_unsampled_fast_requests_write_nothing(client, session, tmp_path):
+    profiler = make_profiler(tmp_path, sample_rate=0.0)
+    profiler.instrument(session.bind)
+
+    with TestClient(ProfilingMiddleware(app, profiler)) as profiled:
+        profiled.get('/users/')
+
+    assert not list(tmp_path.iterdir())
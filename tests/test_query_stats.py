@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+
+from fast_zero.app import app
+from fast_zero.query_stats import (
+    QueryStats,
+    QueryStatsMiddleware,
+    RouteQueryMetrics,
+    query_metrics,
+    route_query_metrics,
+    unmatched_query_metrics,
+)
+
+from .factories import TodoFactory
+
+# comandos por requisição com o cache de autenticação frio
+QUERY_BUDGETS = [
+    ('get', '/todos/', None, 2),
+    ('get', '/todos/?meta=true', None, 3),
+    ('get', '/todos/?title=todo', None, 2),
+    ('get', '/todos/changes', None, 2),
+    ('get', '/users/', None, 1),
+    ('get', '/users/1', None, 1),
+    (
+        'post',
+        '/todos/',
+        {'title': 't', 'description': 'd', 'state': 'draft'},
+        2,
+    ),
+    ('patch', '/todos/1', {'state': 'done'}, 2),
+    (
+        'patch',
+        '/todos/bulk',
+        {'ids': [1], 'changes': {'state': 'done'}},
+        2,
+    ),
+]
+
+
+@pytest_asyncio.fixture
+async def todo(session, user):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    return todo
+
+
+def test_query_stats_keeps_slowest_statement():
+    stats = QueryStats()
+    stats.observe('SELECT 1', 0.002)
+    stats.observe('SELECT 2', 0.001)
+
+    assert stats.count == 2  # noqa: PLR2004
+    assert stats.slowest_statement == 'SELECT 1'
+    assert stats.server_timing() == (
+        'db;dur=3.00;desc="2 queries", db-slowest;dur=2.00'
+    )
+
+
+@pytest.mark.usefixtures('todo')
+@pytest.mark.parametrize(('method', 'url', 'body', 'maximum'), QUERY_BUDGETS)
+def test_query_budget(  # noqa: PLR0913, PLR0917
+    client, token, assert_max_queries, method, url, body, maximum
+):
+    kwargs = {'headers': {'Authorization': token}}
+    if body is not None:
+        kwargs['json'] = body
+
+    with assert_max_queries(maximum):
+        response = client.request(method, url, **kwargs)
+
+    assert response.status_code < HTTPStatus.BAD_REQUEST
+
+
+def test_server_timing_only_in_debug(client, token):
+    response = client.get('/todos/', headers={'Authorization': token})
+    assert 'server-timing' not in response.headers
+
+    with TestClient(QueryStatsMiddleware(app, debug=True)) as debug_client:
+        response = debug_client.get(
+            '/todos/', headers={'Authorization': token}
+        )
+
+    # autenticação já em cache: só a listagem vai ao banco
+    assert response.headers['server-timing'].startswith('db;dur=')
+    assert 'desc="1 queries"' in response.headers['server-timing']
+
+
+def test_query_metrics_aggregate_per_route(client, token, monkeypatch):
+    monkeypatch.setitem(
+        route_query_metrics, ('GET', '/todos/'), RouteQueryMetrics()
+    )
+    headers = {'Authorization': token}
+    client.get('/todos/', headers=headers)
+    client.get('/todos/', headers=headers)
+
+    metrics = query_metrics()['GET /todos/']
+    assert metrics['requests'] == 2  # noqa: PLR2004
+    assert metrics['statements'] == 3  # noqa: PLR2004 autenticação em cache
+    assert metrics['max_statements'] == 2  # noqa: PLR2004
+
+
+def test_query_metrics_fold_unknown_methods_into_unmatched(client):
+    entries = len(route_query_metrics)
+    before = unmatched_query_metrics.requests
+
+    for n in range(5):
+        client.request(f'X{n}', '/users/1')
+
+    assert len(route_query_metrics) == entries
+    assert unmatched_query_metrics.requests == before + 5  # noqa: PLR2004
+    assert 'X0 /users/{user_id}' not in query_metrics()
@@ -1,11 +1,13 @@
 from http import HTTPStatus
 
+from freezegun import freeze_time
 from jwt import decode
 
-from fast_zero.security import create_token
+from fast_zero.security import create_token, principal_cache, token_cache
 from fast_zero.settings import Settings
 
 SECRET_KEY_JWT = Settings().SECRET_KEY_JWT
+EXPIRE_MINUTES = Settings().EXPIRE_MINUTES
 
 
 def test_jwt():
@@ -41,3 +43,57 @@ def test_token_without_email(client):
     )
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_principal_cache_skips_database(client, token, count_queries):
+    client.get('/todos/', headers={'Authorization': token})
+
+    with count_queries() as statements:
+        response = client.get('/todos/', headers={'Authorization': token})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 1
+    assert principal_cache.stats()['hits'] == 1
+
+
+def test_principal_cache_invalidated_on_delete(client, user, token):
+    client.get('/todos/', headers={'Authorization': token})
+    client.delete(f'/users/{user.id}', headers={'Authorization': token})
+
+    response = client.get('/todos/', headers={'Authorization': token})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_principal_cache_invalidated_on_update(client, user, token):
+    client.get('/todos/', headers={'Authorization': token})
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': token},
+        json={'username': 'Bob', 'email': 'bob@email.com', 'password': '1'},
+    )
+
+    response = client.get('/todos/', headers={'Authorization': token})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_cache_skips_signature_check(client, token):
+    client.get('/todos/', headers={'Authorization': token})
+    client.get('/todos/', headers={'Authorization': token})
+
+    assert token_cache.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_cached_token_still_expires(client, user):
+    with freeze_time('2026-01-01 12:00:00'):
+        token = create_token({'sub': user.email})
+        headers = {'Authorization': f'Bearer {token}'}
+        assert client.get('/todos/', headers=headers).status_code == (
+            HTTPStatus.OK
+        )
+
+    with freeze_time(f'2026-01-01 12:{EXPIRE_MINUTES + 1}:00'):
+        response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
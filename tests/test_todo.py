@@ -1,19 +1,17 @@
+import csv
+import io
+import json
+from base64 import urlsafe_b64encode
+from datetime import datetime
 from http import HTTPStatus
 
-import factory.fuzzy
 import pytest
+from sqlalchemy import select, update
 
 from fast_zero.models import Todo, TodoState
+from fast_zero.pagination import encode_cursor
 
-
-class TodoFactory(factory.Factory):
-    class Meta:
-        model = Todo
-
-    title = factory.Faker('text', max_nb_chars=30)
-    description = factory.Faker('text')
-    state = factory.fuzzy.FuzzyChoice(TodoState)
-    user_id = 1
+from .factories import TodoFactory
 
 
 def test_create_todo(client, token):
@@ -144,3 +142,752 @@ async def test_list_todos_filter_combined_should_return_5_todos(
     )
 
     assert len(response.json()['todos']) == expected_todos
+
+
+@pytest.mark.asyncio
+async def test_list_todos_does_not_load_user_todos(
+    session, client, user, token, count_queries
+):
+    session.add_all(TodoFactory.create_batch(50, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.get('/todos/', headers={'Authorization': token})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 2  # noqa: PLR2004 autenticação + listagem
+
+
+@pytest.mark.asyncio
+async def test_list_todos_does_not_load_entities(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    response = client.get(
+        '/todos/?sort=title', headers={'Authorization': token}
+    )
+
+    assert len(response.json()['todos']) == 5  # noqa: PLR2004
+    assert len(session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_list_todos_cursor_pagination(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': token}
+
+    first = client.get('/todos/?limit=2', headers=headers).json()
+    second = client.get(
+        f'/todos/?limit=2&cursor={first["next_cursor"]}', headers=headers
+    ).json()
+    third = client.get(
+        f'/todos/?limit=2&cursor={second["next_cursor"]}', headers=headers
+    ).json()
+    back = client.get(
+        f'/todos/?limit=2&cursor={third["prev_cursor"]}', headers=headers
+    ).json()
+
+    assert [t['id'] for t in first['todos']] == [1, 2]
+    assert 'prev_cursor' not in first
+    assert [t['id'] for t in second['todos']] == [3, 4]
+    assert [t['id'] for t in third['todos']] == [5]
+    assert 'next_cursor' not in third
+    assert back['todos'] == second['todos']
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todos/?cursor=invalid', headers={'Authorization': token}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+@pytest.mark.asyncio
+async def test_list_todos_sorted_by_title_desc(session, client, user, token):
+    for title in ['b todo', 'a todo', 'c todo']:
+        session.add(TodoFactory(user_id=user.id, title=title))
+    await session.commit()
+
+    response = client.get(
+        '/todos/?sort=title&order=desc', headers={'Authorization': token}
+    )
+
+    titles = [todo['title'] for todo in response.json()['todos']]
+    assert titles == ['c todo', 'b todo', 'a todo']
+
+
+@pytest.mark.asyncio
+async def test_list_todos_sorted_cursor_pagination(
+    session, client, user, token
+):
+    for title in ['b', 'a', 'c', 'a']:
+        session.add(TodoFactory(user_id=user.id, title=f'{title} todo'))
+    await session.commit()
+    headers = {'Authorization': token}
+
+    first = client.get('/todos/?sort=title&limit=3', headers=headers).json()
+    second = client.get(
+        f'/todos/?sort=title&limit=3&cursor={first["next_cursor"]}',
+        headers=headers,
+    ).json()
+
+    assert [t['id'] for t in first['todos']] == [2, 4, 1]
+    assert [t['id'] for t in second['todos']] == [3]
+
+
+def test_list_todos_cursor_from_other_sort(client, token):
+    cursor = encode_cursor([1], 'next', [Todo.id])
+    response = client.get(
+        f'/todos/?sort=title&cursor={cursor}',
+        headers={'Authorization': token},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize('values', [['x'], ['x', 1, 2], 'x', {'title': 'x'}])
+def test_list_todos_cursor_with_malformed_values(client, token, values):
+    data = json.dumps({'k': ['title', 'id'], 'v': values, 'd': 'next'})
+    cursor = urlsafe_b64encode(data.encode()).decode()
+    response = client.get(
+        f'/todos/?sort=title&cursor={cursor}',
+        headers={'Authorization': token},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_list_todos_invalid_sort_field(client, token):
+    response = client.get(
+        '/todos/?sort=description', headers={'Authorization': token}
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_todos_search_orders_by_relevance(
+    session, client, user, token
+):
+    titles = ['comprar pão e leite amanhã', 'Leite'] + [
+        f'lavar o carro {n}' for n in range(8)
+    ]
+    session.add_all(
+        TodoFactory(user_id=user.id, title=title, description='descrição')
+        for title in titles
+    )
+    await session.commit()
+
+    response = client.get(
+        '/todos/?title=leite', headers={'Authorization': token}
+    )
+
+    assert [t['id'] for t in response.json()['todos']] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_search_follows_updates(session, client, user, token):
+    session.add(TodoFactory(user_id=user.id, title='old title'))
+    await session.commit()
+    headers = {'Authorization': token}
+
+    client.patch('/todos/1', headers=headers, json={'title': 'new title'})
+
+    old = client.get('/todos/?title=old', headers=headers).json()
+    new = client.get('/todos/?title=new', headers=headers).json()
+    assert old['todos'] == []
+    assert [t['id'] for t in new['todos']] == [1]
+
+
+def test_create_todos_bulk_reports_invalid_items(client, token, count_queries):
+    items = [
+        {'title': 'first', 'description': 'd', 'state': 'draft'},
+        {'title': 'invalid', 'description': 'd', 'state': 'unknown'},
+        {'title': 'second', 'description': 'd', 'state': 'todo'},
+        {'description': 'missing title', 'state': 'todo'},
+    ]
+    with count_queries() as statements:
+        response = client.post(
+            '/todos/bulk', headers={'Authorization': token}, json=items
+        )
+
+    body = response.json()
+    assert response.status_code == HTTPStatus.CREATED
+    assert [todo['title'] for todo in body['todos']] == ['first', 'second']
+    assert [error['index'] for error in body['errors']] == [1, 3]
+    assert body['errors'][1]['errors'][0]['loc'] == ['title']
+    inserts = [s for s in statements if s.startswith('INSERT INTO todos')]
+    assert len(inserts) == 1
+
+
+def test_create_todos_bulk_reports_non_object_items(client, token):
+    item = {'title': 'todo', 'description': 'd', 'state': 'draft'}
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': token},
+        json=[item, 'oops', None, [item]],
+    )
+
+    body = response.json()
+    assert response.status_code == HTTPStatus.CREATED
+    assert [todo['title'] for todo in body['todos']] == ['todo']
+    assert [error['index'] for error in body['errors']] == [1, 2, 3]
+    assert body['errors'][0]['errors'][0]['type'] == 'model_type'
+
+
+def test_create_todos_bulk_rejects_oversized_batch(client, token, monkeypatch):
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.settings.TODO_BULK_MAX_ITEMS', 1
+    )
+    item = {'title': 'todo', 'description': 'd', 'state': 'draft'}
+    response = client.post(
+        '/todos/bulk', headers={'Authorization': token}, json=[item, item]
+    )
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_update_todos_bulk_by_ids(
+    session, client, user, another_user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, state=TodoState.doing)
+    )
+    session.add(TodoFactory(user_id=another_user.id, state=TodoState.doing))
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': token},
+        json={'ids': [1, 2, 4], 'changes': {'state': 'done'}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'updated': 2, 'ids': [1, 2]}
+
+
+@pytest.mark.asyncio
+async def test_update_todos_bulk_by_filter(
+    session, client, user, token, count_queries
+):
+    session.add_all(
+        TodoFactory.create_batch(
+            2, user_id=user.id, title='Sprint task', state=TodoState.doing
+        )
+    )
+    session.add(
+        TodoFactory(user_id=user.id, title='Other', state=TodoState.doing)
+    )
+    session.add(
+        TodoFactory(user_id=user.id, title='Sprint', state=TodoState.todo)
+    )
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.patch(
+            '/todos/bulk',
+            headers={'Authorization': token},
+            json={
+                'filter': {'title': 'sprint', 'state': 'doing'},
+                'changes': {'state': 'done'},
+            },
+        )
+    done = client.get('/todos/?state=done', headers={'Authorization': token})
+
+    assert response.json() == {'updated': 2, 'ids': [1, 2]}
+    assert [todo['id'] for todo in done.json()['todos']] == [1, 2]
+    updates = [s for s in statements if s.startswith('UPDATE todos')]
+    assert len(updates) == 1
+
+
+def test_update_todos_bulk_requires_selection(client, token):
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': token},
+        json={'changes': {'state': 'done'}},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    'body',
+    [
+        {'filter': {}, 'changes': {'state': 'done'}},
+        {'filter': {'state': None}, 'changes': {'state': 'done'}},
+        {'ids': [1], 'changes': {'title': None}},
+        {'ids': [1], 'changes': {'state': 'done', 'description': None}},
+    ],
+)
+@pytest.mark.asyncio
+async def test_update_todos_bulk_rejects_unsafe_bodies(
+    session, client, user, token, body
+):
+    session.add(TodoFactory(user_id=user.id, state=TodoState.doing))
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk', headers={'Authorization': token}, json=body
+    )
+    todos = client.get('/todos/?state=doing', headers={'Authorization': token})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert len(todos.json()['todos']) == 1
+
+
+def test_single_todo_writes_emit_one_statement(client, token, count_queries):
+    headers = {'Authorization': token}
+    client.get('/todos/', headers=headers)  # aquece o cache de autenticação
+
+    with count_queries() as created:
+        client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': 'todo', 'description': 'd', 'state': 'draft'},
+        )
+    with count_queries() as updated:
+        response = client.patch(
+            '/todos/1', headers=headers, json={'state': 'done'}
+        )
+
+    assert len(created) == 1
+    assert created[0].startswith('INSERT INTO todos')
+    assert len(updated) == 1
+    assert updated[0].startswith('UPDATE todos')
+    assert response.json()['state'] == 'done'
+
+
+def test_update_todo_not_found(client, token):
+    response = client.patch(
+        '/todos/10', headers={'Authorization': token}, json={'state': 'done'}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Todo not found'}
+
+
+@pytest.mark.asyncio
+async def test_export_todos_ndjson(session, client, user, token, monkeypatch):
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.settings.EXPORT_CHUNK_SIZE', 2
+    )
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    response = client.get('/todos/export', headers={'Authorization': token})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [line['id'] for line in lines] == [1, 2, 3, 4, 5]
+    assert set(lines[0]) == {'id', 'title', 'description', 'state'}
+
+
+@pytest.mark.asyncio
+async def test_export_todos_csv(session, client, user, token):
+    session.add(
+        TodoFactory(
+            user_id=user.id, title='a, "b"', description='d', state='draft'
+        )
+    )
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv', headers={'Authorization': token}
+    )
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert response.headers['content-type'].startswith('text/csv')
+    assert rows == [
+        ['id', 'title', 'description', 'state'],
+        ['1', 'a, "b"', 'd', 'draft'],
+    ]
+
+
+def test_import_todos_ndjson(client, token, monkeypatch, count_queries):
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.settings.IMPORT_BATCH_SIZE', 2
+    )
+    body = '\n'.join([
+        json.dumps({'title': 'a', 'description': 'd', 'state': 'draft'}),
+        json.dumps({'title': 'b', 'description': 'd', 'state': 'nope'}),
+        '{not json',
+        '',
+        json.dumps({'title': 'c', 'description': 'd', 'state': 'todo'}),
+        json.dumps({'title': 'd', 'description': 'd', 'state': 'done'}),
+    ])
+
+    with count_queries() as statements:
+        response = client.post(
+            '/todos/import',
+            headers={'Authorization': token},
+            content=body.encode(),
+        )
+
+    result = response.json()
+    assert response.status_code == HTTPStatus.OK
+    assert result['imported'] == 3  # noqa: PLR2004
+    assert result['failed'] == 2  # noqa: PLR2004
+    assert [error['line'] for error in result['errors']] == [2, 3]
+    inserts = [s for s in statements if s.startswith('INSERT INTO todos')]
+    assert len(inserts) == 2  # noqa: PLR2004 lotes de 2 + 1
+
+
+@pytest.mark.asyncio
+async def test_import_todos_csv_roundtrip(session, client, user, token):
+    session.add(
+        TodoFactory(
+            user_id=user.id, title='multi\nline, "quoted"', description='d'
+        )
+    )
+    await session.commit()
+    headers = {'Authorization': token}
+    exported = client.get('/todos/export?format=csv', headers=headers)
+
+    response = client.post(
+        '/todos/import?format=csv',
+        headers=headers,
+        content=exported.content + b'2,short\n',
+    )
+    todos = client.get('/todos/', headers=headers).json()['todos']
+
+    assert response.json()['imported'] == 1
+    assert response.json()['errors'] == [
+        {'line': 4, 'errors': [{'msg': 'Wrong number of columns'}]}
+    ]
+    assert todos[1]['title'] == 'multi\nline, "quoted"'
+
+
+def test_import_todos_csv_quote_inside_unquoted_field(client, token):
+    body = 'title,description,state\nbad 5" screen,d,todo\nnext,d,done\n'
+
+    response = client.post(
+        '/todos/import?format=csv',
+        headers={'Authorization': token},
+        content=body.encode(),
+    )
+
+    assert response.json() == {'imported': 2, 'failed': 0, 'errors': []}
+
+
+def test_import_todos_limits_record_length(client, token, monkeypatch):
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.settings.IMPORT_MAX_RECORD_LENGTH', 40
+    )
+    body = '\n'.join([
+        'title,description,state',
+        f'{"x" * 50},d,todo',
+        'short,d,todo',
+        f'"open,{"y" * 30}',
+        'z' * 30,
+        'closed",d,todo',
+        'after,d,draft',
+    ])
+
+    response = client.post(
+        '/todos/import?format=csv',
+        headers={'Authorization': token},
+        content=body.encode(),
+    )
+
+    assert response.json() == {
+        'imported': 2,
+        'failed': 2,
+        'errors': [
+            {'line': 2, 'errors': [{'msg': 'Line too long'}]},
+            {'line': 4, 'errors': [{'msg': 'Record too long'}]},
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_todos_not_modified(
+    session, client, user, token, count_queries
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': token}
+    client.get('/todos/', headers=headers)  # aquece o cache de autenticação
+
+    response = client.get('/todos/', headers=headers)
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    with count_queries() as statements:
+        cached = client.get(
+            '/todos/', headers={**headers, 'If-None-Match': f'W/{etag}'}
+        )
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(statements) == 1
+    assert 'description' not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_etag_follows_writes(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': token}
+    etag = client.get('/todos/', headers=headers).headers['ETag']
+    conditional = {**headers, 'If-None-Match': etag}
+
+    client.patch('/todos/1', headers=headers, json={'title': 'changed'})
+    updated = client.get('/todos/', headers=conditional)
+    assert updated.status_code == HTTPStatus.OK
+    assert updated.json()['todos'][0]['title'] == 'changed'
+
+    etag = updated.headers['ETag']
+    client.patch(
+        '/todos/bulk',
+        headers=headers,
+        json={'ids': [2], 'changes': {'state': 'done'}},
+    )
+    bulk = client.get('/todos/', headers={**headers, 'If-None-Match': etag})
+    assert bulk.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_list_todos_search_not_modified(session, client, user, token):
+    session.add(TodoFactory(user_id=user.id, title='buy milk'))
+    await session.commit()
+    headers = {'Authorization': token}
+
+    etag = client.get('/todos/?title=milk', headers=headers).headers['ETag']
+    cached = client.get(
+        '/todos/?title=milk', headers={**headers, 'If-None-Match': etag}
+    )
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': token}
+
+    first = client.get('/todos/changes?limit=2', headers=headers).json()
+    assert [t['id'] for t in first['todos']] == [1, 2]
+    assert first['has_more'] is True
+
+    rest = client.get(
+        f'/todos/changes?since={first["next_token"]}', headers=headers
+    ).json()
+    assert [t['id'] for t in rest['todos']] == [3]
+    assert rest['has_more'] is False
+
+    client.patch('/todos/1', headers=headers, json={'state': 'trash'})
+    changed = client.get(
+        f'/todos/changes?since={rest["next_token"]}', headers=headers
+    ).json()
+
+    assert [t['id'] for t in changed['todos']] == [1]
+    assert changed['todos'][0]['state'] == 'trash'
+    assert changed['todos'][0]['version'] == 2  # noqa: PLR2004
+
+
+def test_list_todo_changes_does_not_repeat_bulk_writes(client, token):
+    headers = {'Authorization': token}
+    items = [
+        {'title': f't{n}', 'description': 'd', 'state': 'todo'}
+        for n in range(5)
+    ]
+    client.post('/todos/bulk', headers=headers, json=items)
+    synced = client.get('/todos/changes', headers=headers).json()
+    assert len(synced['todos']) == len(items)
+
+    client.patch(
+        '/todos/bulk',
+        headers=headers,
+        json={'filter': {'state': 'todo'}, 'changes': {'state': 'done'}},
+    )
+    updated = client.get(
+        f'/todos/changes?since={synced["next_token"]}', headers=headers
+    ).json()
+    assert [t['state'] for t in updated['todos']] == ['done'] * len(items)
+
+    again = client.get(
+        f'/todos/changes?since={updated["next_token"]}', headers=headers
+    ).json()
+    assert again == {
+        'todos': [],
+        'next_token': updated['next_token'],
+        'has_more': False,
+    }
+
+
+def create_todos_through_api(client, headers, count):
+    for n in range(count):
+        client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': f't{n}', 'description': 'd', 'state': 'todo'},
+        )
+
+
+def test_list_todo_changes_pages_writes_in_the_same_second(client, token):
+    headers = {'Authorization': token}
+    create_todos_through_api(client, headers, 5)
+
+    page = client.get('/todos/changes?limit=2', headers=headers).json()
+    ids = [t['id'] for t in page['todos']]
+    for _ in range(5):
+        if not page['has_more']:
+            break
+        page = client.get(
+            f'/todos/changes?limit=2&since={page["next_token"]}',
+            headers=headers,
+        ).json()
+        ids += [t['id'] for t in page['todos']]
+
+    assert ids == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('sort', ['create_at', 'updated_at'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_list_todos_by_timestamp_follows_cursors(client, token, sort, order):
+    headers = {'Authorization': token}
+    create_todos_through_api(client, headers, 5)
+
+    url = f'/todos/?sort={sort}&order={order}&limit=2'
+    page = client.get(url, headers=headers).json()
+    ids = [t['id'] for t in page['todos']]
+    for _ in range(5):
+        if 'next_cursor' not in page:
+            break
+        page = client.get(
+            f'{url}&cursor={page["next_cursor"]}', headers=headers
+        ).json()
+        ids += [t['id'] for t in page['todos']]
+
+    expected = [1, 2, 3, 4, 5]
+    assert ids == (expected if order == 'asc' else expected[::-1])
+
+
+def test_list_todo_changes_empty(client, token):
+    response = client.get('/todos/changes', headers={'Authorization': token})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'todos': [],
+        'next_token': None,
+        'has_more': False,
+    }
+
+
+def test_list_todo_changes_invalid_token(client, token):
+    response = client.get(
+        '/todos/changes?since=nope', headers={'Authorization': token}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_update_todos_bulk_touches_updated_at(
+    session, client, user, token
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    await session.execute(update(Todo).values(updated_at=datetime(2024, 1, 1)))
+    await session.commit()
+
+    client.patch(
+        '/todos/bulk',
+        headers={'Authorization': token},
+        json={'ids': [1], 'changes': {'state': 'done'}},
+    )
+
+    session.expire_all()
+    todo = await session.scalar(select(Todo))
+    assert todo.updated_at > datetime(2024, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_list_todos_fast_serialization_matches(
+    session, client, user, token, monkeypatch
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title=f'todo {n}') for n in range(3)
+    ])
+    await session.commit()
+    headers = {'Authorization': token}
+    queries = ['', '?sort=title&limit=2', '?title=todo']
+
+    default = [client.get(f'/todos/{q}', headers=headers) for q in queries]
+    monkeypatch.setattr(
+        'fast_zero.routers.todos.settings.FAST_SERIALIZATION', True
+    )
+    fast = [client.get(f'/todos/{q}', headers=headers) for q in queries]
+
+    assert [r.json() for r in fast] == [r.json() for r in default]
+    assert [r.headers['ETag'] for r in fast] == [
+        r.headers['ETag'] for r in default
+    ]
+
+
+def test_list_todos_meta_uses_counters(client, token, count_queries):
+    headers = {'Authorization': token}
+    client.post(
+        '/todos/bulk',
+        headers=headers,
+        json=[
+            {'title': f'todo {n}', 'description': 'd', 'state': state}
+            for n, state in enumerate(['draft', 'draft', 'todo', 'doing'])
+        ],
+    )
+    client.patch('/todos/1', headers=headers, json={'state': 'done'})
+    client.patch(
+        '/todos/bulk',
+        headers=headers,
+        json={'ids': [2, 3], 'changes': {'state': 'doing'}},
+    )
+
+    with count_queries() as statements:
+        response = client.get('/todos/?meta=true&limit=2', headers=headers)
+
+    body = response.json()
+    assert body['counts'] == {
+        'draft': 0,
+        'todo': 0,
+        'doing': 3,
+        'done': 1,
+        'trash': 0,
+    }
+    assert body['total'] == 4  # noqa: PLR2004
+    assert body['has_more'] is True
+    assert not any('count(' in statement for statement in statements)
+
+    doing = client.get(
+        '/todos/?meta=true&state=doing&limit=5', headers=headers
+    ).json()
+    assert doing['total'] == 3  # noqa: PLR2004
+    assert doing['has_more'] is False
+
+    searched = client.get('/todos/?meta=true&title=todo', headers=headers)
+    assert 'total' not in searched.json()
+    assert searched.json()['has_more'] is False
+
+
+def test_list_todos_without_meta_omits_totals(client, token):
+    response = client.get('/todos/', headers={'Authorization': token})
+    assert response.json() == {'todos': []}
+
+
+@pytest.mark.asyncio
+async def test_list_todos_meta_etag_follows_counts(
+    session, client, user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, state=TodoState.draft)
+    )
+    await session.commit()
+    headers = {'Authorization': token}
+    etag = client.get('/todos/?meta=true&limit=1', headers=headers).headers[
+        'ETag'
+    ]
+
+    # muda um todo fora da página: só os totais mudam
+    client.patch('/todos/2', headers=headers, json={'state': 'trash'})
+    response = client.get(
+        '/todos/?meta=true&limit=1',
+        headers={**headers, 'If-None-Match': etag},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['counts']['trash'] == 1
@@ -1,7 +1,13 @@
 from http import HTTPStatus
 
+import pytest
+from sqlalchemy import func, select
+
+from fast_zero.models import Todo, TodoCount
 from fast_zero.schemas import UserPublic
 
+from .factories import TodoFactory
+
 USER = {'id': 1, 'username': 'Jhon', 'email': 'jhon@email.com'}
 
 
@@ -102,6 +108,19 @@ def test_delete_user(client, user, token):
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
+@pytest.mark.asyncio
+async def test_delete_user_removes_todos(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.delete(
+        f'/users/{user.id}/', headers={'Authorization': token}
+    )
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert await session.scalar(select(func.count(Todo.id))) == 0
+
+
 def test_delete_user_without_permissions(client, token):
     response = client.delete('/users/2/', headers={'Authorization': token})
     assert response.status_code == HTTPStatus.FORBIDDEN
@@ -114,3 +133,166 @@ def test_delete_user_with_wrong_user(client, another_user, token):
     )
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_list_users_cursor_pagination(client, user, another_user):
+    first = client.get('/users/?limit=1').json()
+    second = client.get(f'/users/?limit=1&cursor={first["next_cursor"]}')
+
+    assert first['users'][0]['id'] == user.id
+    assert second.json()['users'][0]['id'] == another_user.id
+    assert 'next_cursor' not in second.json()
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_list_users_by_timestamp_reaches_every_user(
+    client, user, another_user, order
+):
+    # os dois usuários são criados no mesmo segundo, sem mockar o tempo
+    url = f'/users/?sort=create_at&order={order}&limit=1'
+    page = client.get(url).json()
+    ids = [u['id'] for u in page['users']]
+    for _ in range(3):
+        if 'next_cursor' not in page:
+            break
+        page = client.get(f'{url}&cursor={page["next_cursor"]}').json()
+        ids += [u['id'] for u in page['users']]
+
+    expected = [user.id, another_user.id]
+    assert ids == (expected if order == 'asc' else expected[::-1])
+
+
+def test_list_users_sorted_by_username_desc(client, user, another_user):
+    response = client.get('/users/?sort=username&order=desc')
+
+    usernames = [u['username'] for u in response.json()['users']]
+    assert usernames == sorted(
+        [user.username, another_user.username], reverse=True
+    )
+
+
+def test_create_user_fetches_defaults_with_insert(client, count_queries):
+    data = {**USER, 'password': '123456'}
+    with count_queries() as statements:
+        client.post('/users/', json=data)
+
+    assert len(statements) == 2  # noqa: PLR2004 checagem de conflito + INSERT
+    assert 'RETURNING' in statements[-1]
+    assert 'create_at' in statements[-1].split('RETURNING')[1]
+
+
+def test_update_user_emits_one_statement(client, user, token, count_queries):
+    headers = {'Authorization': token}
+    client.get('/todos/', headers=headers)  # aquece o cache de autenticação
+    data = {'username': 'Bob', 'email': 'bob@email.com', 'password': '1'}
+
+    with count_queries() as statements:
+        response = client.put(f'/users/{user.id}', headers=headers, json=data)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 1
+    assert statements[0].startswith('UPDATE users')
+
+
+def test_get_user_not_modified(client, user, token):
+    response = client.get(f'/users/{user.id}')
+    etag = response.headers['ETag']
+
+    cached = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['ETag'] == etag
+    assert not cached.content
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': token},
+        json={'username': 'Bob', 'email': 'bob@email.com', 'password': '1'},
+    )
+    changed = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+    assert changed.status_code == HTTPStatus.OK
+    assert changed.json()['username'] == 'Bob'
+    assert changed.headers['ETag'] != etag
+
+
+def test_get_user_not_found_with_etag(client):
+    response = client.get('/users/2', headers={'If-None-Match': '"x"'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_list_users_not_modified(client, user, another_user, count_queries):
+    etag = client.get('/users/?limit=1').headers['ETag']
+
+    with count_queries() as statements:
+        cached = client.get('/users/?limit=1', headers={'If-None-Match': etag})
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(statements) == 1
+    assert 'password' not in statements[0]
+
+    other_page = client.get(
+        '/users/?limit=1&skip=1', headers={'If-None-Match': etag}
+    )
+    assert other_page.status_code == HTTPStatus.OK
+
+
+def test_list_users_fast_serialization_matches(
+    client, user, another_user, monkeypatch, count_queries
+):
+    default = client.get('/users/?limit=1')
+    monkeypatch.setattr(
+        'fast_zero.routers.users.settings.FAST_SERIALIZATION', True
+    )
+    with count_queries() as statements:
+        fast = client.get('/users/?limit=1')
+
+    assert fast.json() == default.json()
+    assert fast.headers['ETag'] == default.headers['ETag']
+    assert 'password' not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_user_reads_do_not_load_entities(
+    session, client, user, count_queries
+):
+    session.expunge_all()
+
+    with count_queries() as statements:
+        listed = client.get('/users/')
+        fetched = client.get(f'/users/{user.id}')
+
+    assert listed.json()['users'] == [fetched.json()]
+    assert len(session.identity_map) == 0
+    assert not any('password' in statement for statement in statements)
+
+
+def test_list_users_meta_has_more(client, user, another_user):
+    first = client.get('/users/?limit=1&meta=true').json()
+    last = client.get('/users/?limit=1&skip=1&meta=true').json()
+
+    assert first['has_more'] is True
+    assert last['has_more'] is False
+
+
+def test_list_users_meta_total_follows_writes(client, user, token):
+    assert client.get('/users/?meta=true').json()['total'] == 1
+
+    client.post(
+        '/users/',
+        json={'username': 'new', 'email': 'new@email.com', 'password': 'p'},
+    )
+    page = client.get('/users/?meta=true&limit=1').json()
+    assert page['total'] == 2  # noqa: PLR2004
+
+    client.delete(f'/users/{user.id}', headers={'Authorization': token})
+    assert client.get('/users/?meta=true').json()['total'] == 1
+    assert 'total' not in client.get('/users/').json()
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_todo_counts(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    await session.commit()
+
+    client.delete(f'/users/{user.id}', headers={'Authorization': token})
+
+    assert await session.scalar(select(func.count(TodoCount.user_id))) == 0